@@ -8,9 +8,10 @@ from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 import datetime
 import argparse
+import threading
 
 # Fix for numpy compatibility issues with newer versions
 try:
@@ -97,6 +98,25 @@ budget_visualizer = BudgetVisualizer()
 paypal_processor = PayPalProcessor()
 crypto_processor = CryptoProcessor()
 
+@app.on_event("startup")
+def prewarm_services():
+    """Fetch the PayPal token and Trello labels in the background when THOMAS_PREWARM is set"""
+    if os.getenv("THOMAS_PREWARM", "false").lower() not in ("1", "true"):
+        return
+    
+    paypal_processor.warmup()
+    
+    board_ids = [b.strip() for b in os.getenv("TRELLO_BOARD_IDS", "").split(",") if b.strip()]
+    if TRELLO_API_KEY and TRELLO_TOKEN and board_ids:
+        def warm_trello():
+            try:
+                trello.warmup(board_ids)
+                logger.info(f"Pre-warmed Trello labels for {len(board_ids)} boards")
+            except Exception as e:
+                logger.warning(f"Could not pre-warm Trello labels: {str(e)}")
+        
+        threading.Thread(target=warm_trello, daemon=True).start()
+
 # Pydantic models for API
 class PaymentCreate(BaseModel):
     employee_id: str
@@ -162,6 +182,9 @@ class SearchQuery(BaseModel):
     query: str
     category: Optional[str] = None
 
+class EmployeeBatchQuery(BaseModel):
+    ids: List[str]
+
 # API Routes
 
 # Root endpoint
@@ -208,6 +231,16 @@ def get_employee_payments(employee_id: str, db=Depends(get_db)):
     payments = db.query(Payment).filter(Payment.employee_id == employee_id).all()
     return [payment.to_dict() for payment in payments]
 
+@app.post("/payments/employees/batch", response_model=Dict[str, List[dict]])
+def get_employees_payments(query: EmployeeBatchQuery, db=Depends(get_db)):
+    """Get the payments for several employees in one query, keyed by employee ID"""
+    employee_payments = {employee_id: [] for employee_id in query.ids}
+    if query.ids:
+        payments = db.query(Payment).filter(Payment.employee_id.in_(query.ids)).all()
+        for payment in payments:
+            employee_payments[payment.employee_id].append(payment.to_dict())
+    return employee_payments
+
 # Project routes
 @app.post("/projects/", response_model=dict)
 def create_project(project: ProjectCreate, db=Depends(get_db)):
@@ -24,11 +24,11 @@ def import_data():
         
         # Initialize projects
         from utils.initialize_projects import initialize_projects
-        initialize_projects()
+        initialize_projects(csv_path)
         
         # Initialize assets
         from utils.initialize_assets import initialize_assets
-        initialize_assets()
+        initialize_assets(csv_path)
         
         print("Data import completed successfully.")
         return True
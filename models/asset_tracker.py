@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 import enum
 import datetime
@@ -45,6 +45,9 @@ class Asset(Base):
     created_date = Column(String, default=datetime.datetime.now().strftime("%Y-%m-%d"))
     due_date = Column(String, nullable=True)
     
+    # Covers the per-project asset listing
+    __table_args__ = (Index("ix_assets_project_name", "project_id", "name"),)
+    
     # Define relationships
     dependencies = relationship(
         "Asset", 
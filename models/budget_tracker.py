@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 import datetime
 
@@ -37,6 +37,9 @@ class Expense(Base):
     date = Column(String)
     description = Column(String)
     
+    # Covers the per-project expense listing
+    __table_args__ = (Index("ix_expenses_project_description_date", "project_id", "description", "date"),)
+    
     # Relationships
     project = relationship("Project", back_populates="expenses")
     
@@ -2,6 +2,9 @@ import os
 import requests
 import json
 import datetime
+import hashlib
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
 import logging
 
@@ -18,11 +21,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ai_assistant")
 
-class ThomasAIAssistant:
-    """Thomas AI assistant that interacts with OpenAI's API"""
+# Maximum number of answers kept in the shared response cache
+RESPONSE_CACHE_SIZE = 128
+
+def _normalize_question(question):
+    """Lowercase, collapse whitespace and drop trailing punctuation so trivially different prompts match"""
+    return " ".join(question.lower().split()).rstrip("?!. ")
+
+def _markdown_table(columns, rows):
+    """Render rows as a Markdown table; column names are written once instead of per record"""
+    lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    lines.extend("| " + " | ".join(str(cell) for cell in row) + " |" for row in rows)
+    return "\n".join(lines) + "\n"
+
+class AssistantCore:
+    """
+    Process-wide assistant resources: API configuration, system prompt and knowledge base.
+    A single core can be shared by every conversation; it holds no per-user state.
+    """
     
     def __init__(self):
-        """Initialize the assistant with API key and system prompt"""
+        """Initialize the API key, system prompt and knowledge base"""
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.model = "gpt-4" if os.getenv("USE_GPT4", "false").lower() == "true" else "gpt-3.5-turbo"
         
@@ -49,11 +68,6 @@ class ThomasAIAssistant:
         player retention strategies, and platform-specific considerations.
         """
         
-        # Initialize conversation history with system prompt
-        self.conversation_history = [
-            {"role": "system", "content": self.system_prompt}
-        ]
-        
         # Initialize knowledge base
         try:
             self.knowledge_base = get_knowledge_base()
@@ -63,6 +77,74 @@ class ThomasAIAssistant:
         except Exception as e:
             logger.error(f"Error initializing knowledge base: {str(e)}")
             self.knowledge_base = None
+        
+        # Answers to repeated questions, shared by all conversations using this core
+        self._response_cache = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+    
+    def response_cache_key(self, question, context_messages):
+        """
+        Build the response cache key for a question
+        
+        Args:
+            question (str): The user's question
+            context_messages (list): Every message sent before the question
+        
+        Returns:
+            str: Cache key; answers are only reused when the whole prompt context matches
+        """
+        key_data = json.dumps([self.model, _normalize_question(question), context_messages], sort_keys=True)
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+    
+    def get_cached_response(self, key):
+        """Get a cached answer, or None"""
+        with self._response_cache_lock:
+            answer = self._response_cache.get(key)
+            if answer is not None:
+                self._response_cache.move_to_end(key)
+            return answer
+    
+    def cache_response(self, key, answer):
+        """Store an answer, evicting the least recently used one when full"""
+        with self._response_cache_lock:
+            self._response_cache[key] = answer
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+
+
+class ThomasAIAssistant:
+    """Thomas AI assistant that interacts with OpenAI's API"""
+    
+    def __init__(self, core=None):
+        """
+        Initialize a conversation with Thomas
+        
+        Args:
+            core (AssistantCore, optional): Shared assistant resources; a new core is created if omitted
+        """
+        self.core = core or AssistantCore()
+        
+        # Initialize conversation history with system prompt
+        self.conversation_history = [
+            {"role": "system", "content": self.system_prompt}
+        ]
+    
+    @property
+    def api_key(self):
+        return self.core.api_key
+    
+    @property
+    def model(self):
+        return self.core.model
+    
+    @property
+    def system_prompt(self):
+        return self.core.system_prompt
+    
+    @property
+    def knowledge_base(self):
+        return self.core.knowledge_base
     
     def ask(self, question, include_data=None):
         """
@@ -75,90 +157,61 @@ class ThomasAIAssistant:
         Returns:
             str: Thomas AI's response
         """
+        return "".join(self.ask_stream(question, include_data))
+    
+    def ask_stream(self, question, include_data=None):
+        """
+        Ask a question to Thomas AI, yielding the response as it is generated
+        
+        Args:
+            question (str): The user's question
+            include_data (dict, optional): Context data to include in the prompt
+            
+        Returns:
+            generator: Pieces of Thomas AI's response, in order
+        """
         # Get relevant knowledge from the knowledge base
         knowledge_context = ""
         if self.knowledge_base:
             try:
                 knowledge_context = self.knowledge_base.get_knowledge_for_context(question)
                 if knowledge_context:
-                    # Add the knowledge context to the conversation
-                    self.conversation_history.append({"role": "system", "content": knowledge_context})
                     logger.info("Added knowledge context to the conversation")
             except Exception as e:
                 logger.error(f"Error getting knowledge context: {str(e)}")
         
-        # If context data is provided, format it for the assistant
+        # Messages go from most to least stable: system prompt, past turns, then the
+        # per-question data and knowledge and the question itself. The chat page filters
+        # the company data down to what each question mentions, so it goes after the
+        # history; the system prompt and past turns stay a prefix the provider's prompt
+        # cache can reuse on every turn.
+        messages = list(self.conversation_history)
         if include_data:
-            # Create a formatted data summary
-            data_context = "Here's some relevant company data to consider:\n\n"
-            
-            # Format projects data
-            if "projects" in include_data and include_data["projects"]:
-                data_context += "## Projects\n"
-                for project in include_data["projects"]:
-                    data_context += f"- {project.get('name', 'Unnamed')}: "
-                    data_context += f"Budget ${project.get('total_budget', 0):,.2f}, "
-                    data_context += f"Timeline: {project.get('start_date', 'N/A')} to {project.get('end_date', 'N/A')}\n"
-                data_context += "\n"
-            
-            # Format payment summary data
-            if "payments" in include_data and include_data["payments"]:
-                payments = include_data["payments"]
-                total_usd = sum(p.get("amount", 0) for p in payments if p.get("currency") == "USD")
-                total_sol = sum(p.get("amount", 0) for p in payments if p.get("currency") == "SOL")
-                
-                data_context += "## Payment Summary\n"
-                data_context += f"- Total USD payments: ${total_usd:,.2f}\n"
-                data_context += f"- Total SOL payments: {total_sol:,.2f} SOL\n"
-                data_context += f"- Total payments in USD equivalent: ${total_usd + (total_sol * 150):,.2f} (using rate of 1 SOL = $150 USD)\n"
-                data_context += f"- Number of payments: {len(payments)}\n\n"
-            
-            # Add employee info if available
-            if "employees" in include_data and include_data["employees"]:
-                data_context += "## Team Members\n"
-                for employee in include_data["employees"]:
-                    data_context += f"- {employee}\n"
-                data_context += "\n"
-            
-            # Add detailed employee payment info if available
-            if "employee_payments" in include_data and include_data["employee_payments"]:
-                data_context += "## Detailed Employee Payments\n"
-                for employee, payments in include_data["employee_payments"].items():
-                    total_usd = sum(p.get("amount", 0) for p in payments if p.get("currency") == "USD")
-                    total_sol = sum(p.get("amount", 0) for p in payments if p.get("currency") == "SOL")
-                    
-                    data_context += f"- {employee}: ${total_usd:,.2f} USD, {total_sol:,.2f} SOL\n"
-                data_context += "\n"
-            
-            # Add asset info if available
-            if "assets" in include_data and include_data["assets"]:
-                data_context += "## Asset Status\n"
-                assets_by_status = {}
-                for asset in include_data["assets"]:
-                    status = asset.get("status", "unknown")
-                    if status not in assets_by_status:
-                        assets_by_status[status] = 0
-                    assets_by_status[status] += 1
-                
-                for status, count in assets_by_status.items():
-                    data_context += f"- {status.capitalize()}: {count} assets\n"
-                data_context += "\n"
-            
-            # Add the data context to the conversation
-            self.conversation_history.append({"role": "system", "content": data_context})
-        
-        # Add the user question to the conversation
-        self.conversation_history.append({"role": "user", "content": question})
+            messages.append({"role": "system", "content": self._format_data_context(include_data)})
+        if knowledge_context:
+            messages.append({"role": "system", "content": knowledge_context})
+        messages.append({"role": "user", "content": question})
         
         # API key validation with helpful error message
         if not self.api_key:
-            return "⚠️ Error: OpenAI API key is not set. Please add your API key to the .env file with the format: OPENAI_API_KEY=your_api_key_here"
+            yield "⚠️ Error: OpenAI API key is not set. Please add your API key to the .env file with the format: OPENAI_API_KEY=your_api_key_here"
+            return
         
         if self.api_key.startswith("sk-"):
             # Key has correct prefix format
             pass
         else:
-            return "⚠️ Error: The OpenAI API key format is incorrect. It should start with 'sk-'. Please check your API key in the .env file."
+            yield "⚠️ Error: The OpenAI API key format is incorrect. It should start with 'sk-'. Please check your API key in the .env file."
+            return
+        
+        # Reuse the answer if this question was already asked with the same context
+        cache_key = self.core.response_cache_key(question, messages[:-1])
+        cached_answer = self.core.get_cached_response(cache_key)
+        if cached_answer is not None:
+            logger.info("Answered from response cache")
+            self._add_exchange(question, cached_answer)
+            yield cached_answer
+            return
         
         try:
             headers = {
@@ -168,47 +221,141 @@ class ThomasAIAssistant:
             
             payload = {
                 "model": self.model,
-                "messages": self.conversation_history,
-                "temperature": 0.7
+                "messages": messages,
+                "temperature": 0.7,
+                "stream": True
             }
             
             response = requests.post(
                 "https://api.openai.com/v1/chat/completions",
                 headers=headers,
-                json=payload
+                json=payload,
+                stream=True
             )
             
             if response.status_code == 200:
-                response_data = response.json()
-                answer = response_data["choices"][0]["message"]["content"]
+                # The body is a server-sent event stream of "data: {...}" lines,
+                # each carrying the next piece of the answer, ending with "data: [DONE]"
+                pieces = []
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data: "):
+                        continue
+                    data = line[len("data: "):]
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0]["delta"].get("content")
+                    if delta:
+                        pieces.append(delta)
+                        yield delta
+                answer = "".join(pieces)
                 
-                # Add the assistant's response to the conversation history
-                self.conversation_history.append({"role": "assistant", "content": answer})
-                
-                # Keep conversation history manageable (max 10 exchanges)
-                if len(self.conversation_history) > 21:  # system prompt + data context + 10 exchanges
-                    # Keep system prompt and last 10 exchanges
-                    self.conversation_history = [self.conversation_history[0]] + self.conversation_history[-20:]
+                self.core.cache_response(cache_key, answer)
+                self._add_exchange(question, answer)
                 
                 # Store this Q&A in knowledge base if it's relevant to game design
                 self._potentially_save_to_knowledge_base(question, answer)
-                
-                return answer
             elif response.status_code == 401:
-                return "⚠️ Authentication Error: The API key you provided is invalid. Please check your API key in the .env file and make sure it's current. You can find your API key at https://platform.openai.com/account/api-keys."
+                yield "⚠️ Authentication Error: The API key you provided is invalid. Please check your API key in the .env file and make sure it's current. You can find your API key at https://platform.openai.com/account/api-keys."
             elif response.status_code == 429:
-                return "⚠️ Rate Limit Error: The API request has been rate limited. This might be due to exceeding your quota or hitting the rate limits. Check your usage at https://platform.openai.com/account/usage."
+                yield "⚠️ Rate Limit Error: The API request has been rate limited. This might be due to exceeding your quota or hitting the rate limits. Check your usage at https://platform.openai.com/account/usage."
             elif response.status_code == 500:
-                return "⚠️ Server Error: OpenAI's servers are experiencing issues. Please try again later."
+                yield "⚠️ Server Error: OpenAI's servers are experiencing issues. Please try again later."
             else:
-                return f"⚠️ Error: API returned status code {response.status_code}. {response.text}"
+                yield f"⚠️ Error: API returned status code {response.status_code}. {response.text}"
                 
         except requests.exceptions.ConnectionError:
-            return "⚠️ Connection Error: Could not connect to OpenAI's API. Please check your internet connection."
+            yield "⚠️ Connection Error: Could not connect to OpenAI's API. Please check your internet connection."
         except requests.exceptions.Timeout:
-            return "⚠️ Timeout Error: The request to OpenAI's API timed out. Please try again later."
+            yield "⚠️ Timeout Error: The request to OpenAI's API timed out. Please try again later."
         except Exception as e:
-            return f"⚠️ Error connecting to OpenAI API: {str(e)}"
+            yield f"⚠️ Error connecting to OpenAI API: {str(e)}"
+    
+    def _add_exchange(self, question, answer):
+        """Add a question and its answer to the conversation history"""
+        self.conversation_history.append({"role": "user", "content": question})
+        self.conversation_history.append({"role": "assistant", "content": answer})
+        
+        # Keep conversation history manageable (max 10 exchanges)
+        if len(self.conversation_history) > 21:  # system prompt + 10 exchanges
+            # Keep system prompt and last 10 exchanges
+            self.conversation_history = [self.conversation_history[0]] + self.conversation_history[-20:]
+    
+    def _format_data_context(self, data):
+        """
+        Format company data as a summary message for the model
+        
+        Args:
+            data (dict): Context data (projects, payments, employees, employee_payments, assets)
+            
+        Returns:
+            str: Formatted data summary
+        """
+        # Create a formatted data summary
+        data_context = "Here's some relevant company data to consider:\n\n"
+        
+        # Format projects data
+        if "projects" in data and data["projects"]:
+            data_context += "## Projects\n"
+            data_context += _markdown_table(
+                ["Project", "Budget (USD)", "Start", "End"],
+                [
+                    [
+                        project.get('name', 'Unnamed'),
+                        f"${project.get('total_budget', 0):,.2f}",
+                        project.get('start_date', 'N/A'),
+                        project.get('end_date', 'N/A')
+                    ]
+                    for project in data["projects"]
+                ]
+            )
+            data_context += "\n"
+        
+        # Format payment summary data
+        if "payments" in data and data["payments"]:
+            payments = data["payments"]
+            total_usd = sum(p.get("amount", 0) for p in payments if p.get("currency") == "USD")
+            total_sol = sum(p.get("amount", 0) for p in payments if p.get("currency") == "SOL")
+            
+            data_context += "## Payment Summary\n"
+            data_context += f"- Total USD payments: ${total_usd:,.2f}\n"
+            data_context += f"- Total SOL payments: {total_sol:,.2f} SOL\n"
+            data_context += f"- Total payments in USD equivalent: ${total_usd + (total_sol * 150):,.2f} (using rate of 1 SOL = $150 USD)\n"
+            data_context += f"- Number of payments: {len(payments)}\n\n"
+        
+        # Add employee info if available
+        if "employees" in data and data["employees"]:
+            data_context += "## Team Members\n"
+            for employee in data["employees"]:
+                data_context += f"- {employee}\n"
+            data_context += "\n"
+        
+        # Add detailed employee payment info if available
+        if "employee_payments" in data and data["employee_payments"]:
+            data_context += "## Detailed Employee Payments\n"
+            rows = []
+            for employee, payments in data["employee_payments"].items():
+                total_usd = sum(p.get("amount", 0) for p in payments if p.get("currency") == "USD")
+                total_sol = sum(p.get("amount", 0) for p in payments if p.get("currency") == "SOL")
+                
+                rows.append([employee, f"${total_usd:,.2f}", f"{total_sol:,.2f}"])
+            data_context += _markdown_table(["Employee", "USD", "SOL"], rows)
+            data_context += "\n"
+        
+        # Add asset info if available
+        if "assets" in data and data["assets"]:
+            data_context += "## Asset Status\n"
+            assets_by_status = {}
+            for asset in data["assets"]:
+                status = asset.get("status", "unknown")
+                if status not in assets_by_status:
+                    assets_by_status[status] = 0
+                assets_by_status[status] += 1
+            
+            for status, count in assets_by_status.items():
+                data_context += f"- {status.capitalize()}: {count} assets\n"
+            data_context += "\n"
+        
+        return data_context
     
     def _potentially_save_to_knowledge_base(self, question, answer):
         """
@@ -1,6 +1,8 @@
 import os
 import sqlite3
 import json
+import functools
+import orjson
 import requests
 from datetime import datetime
 import logging
@@ -17,6 +19,31 @@ logging.basicConfig(
 
 logger = logging.getLogger("knowledge_base")
 
+# Sample content used by initialize_with_sample_data
+SEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kb_seed")
+
+# Seed file -> (table, name column)
+SEED_CATEGORIES = {
+    "concepts": ("game_design_concepts", "concept_name"),
+    "practices": ("industry_practices", "practice_name"),
+    "resources": ("educational_resources", "title"),
+    "research": ("market_research", "title"),
+}
+
+@functools.lru_cache(maxsize=None)
+def _load_seed_file(seed_name):
+    """Load the full entries of a seed file, keyed by entry name"""
+    _, name_field = SEED_CATEGORIES[seed_name]
+    with open(os.path.join(SEED_DIR, f"{seed_name}.json"), encoding="utf-8") as f:
+        return {entry[name_field]: entry for entry in json.load(f)}
+
+def _serialize_json_fields(data):
+    """Return a copy of data with list and dict values encoded as JSON text"""
+    return {
+        key: orjson.dumps(value).decode() if isinstance(value, (list, dict)) else value
+        for key, value in data.items()
+    }
+
 class GameDesignKnowledgeBase:
     """
     Knowledge base for game design concepts, industry practices, and educational materials.
@@ -133,9 +160,7 @@ class GameDesignKnowledgeBase:
         cursor = conn.cursor()
         
         # Convert any list or dict fields to JSON strings
-        for key, value in concept_data.items():
-            if isinstance(value, (list, dict)):
-                concept_data[key] = json.dumps(value)
+        concept_data = _serialize_json_fields(concept_data)
         
         # Prepare fields and values for SQL
         fields = list(concept_data.keys())
@@ -196,9 +221,7 @@ class GameDesignKnowledgeBase:
         cursor = conn.cursor()
         
         # Convert any list or dict fields to JSON strings
-        for key, value in practice_data.items():
-            if isinstance(value, (list, dict)):
-                practice_data[key] = json.dumps(value)
+        practice_data = _serialize_json_fields(practice_data)
         
         # Prepare fields and values for SQL
         fields = list(practice_data.keys())
@@ -259,9 +282,7 @@ class GameDesignKnowledgeBase:
         cursor = conn.cursor()
         
         # Convert any list or dict fields to JSON strings
-        for key, value in resource_data.items():
-            if isinstance(value, (list, dict)):
-                resource_data[key] = json.dumps(value)
+        resource_data = _serialize_json_fields(resource_data)
         
         # Prepare fields and values for SQL
         fields = list(resource_data.keys())
@@ -322,9 +343,7 @@ class GameDesignKnowledgeBase:
         cursor = conn.cursor()
         
         # Convert any list or dict fields to JSON strings
-        for key, value in research_data.items():
-            if isinstance(value, (list, dict)):
-                research_data[key] = json.dumps(value)
+        research_data = _serialize_json_fields(research_data)
         
         # Prepare fields and values for SQL
         fields = list(research_data.keys())
@@ -346,6 +365,78 @@ class GameDesignKnowledgeBase:
         logger.info(f"Added market research: {research_data['title']}")
         return research_id
     
+    # Table -> unique name column add_knowledge_bulk upserts on (None: always insert)
+    BULK_NAME_FIELDS = {
+        "game_design_concepts": "concept_name",
+        "industry_practices": "practice_name",
+        "educational_resources": "title",
+        "market_research": None,
+    }
+    
+    def add_knowledge_bulk(self, entries):
+        """
+        Add many knowledge entries in a single transaction
+        
+        Entries whose name already exists are updated, as with the add_* methods.
+        Embeddings are created after the commit, since they are written on their own connection.
+        
+        Args:
+            entries (dict): Table name -> list of entry dicts with the same fields the add_* methods take
+        
+        Returns:
+            int: Number of distinct rows added or updated
+        """
+        written = []
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                for table, rows in entries.items():
+                    name_field = self.BULK_NAME_FIELDS[table]
+                    if name_field:
+                        # A name repeated within the batch is one row; the last entry wins, as with upserts
+                        rows = list({row[name_field]: row for row in rows}.values())
+                    for row in rows:
+                        row = _serialize_json_fields(row)
+                        fields = list(row.keys())
+                        query = f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({', '.join(['?'] * len(fields))})"
+                        if name_field:
+                            # Update the existing entry instead of failing on the unique name
+                            updates = ", ".join(f"{field} = excluded.{field}" for field in fields)
+                            query += f" ON CONFLICT({name_field}) DO UPDATE SET {updates}"
+                        cursor = conn.execute(query, [row[field] for field in fields])
+                        # lastrowid is only reliable for plain inserts; upserted entries are looked up by name
+                        written.append((table, name_field, row, None if name_field else cursor.lastrowid))
+        finally:
+            conn.close()
+        
+        logger.info(f"Added {len(written)} knowledge entries in bulk")
+        
+        # The entries are committed by now, so an embedding failure must not fail the save
+        if self.openai_api_key:
+            try:
+                self._create_bulk_embeddings(written)
+            except sqlite3.Error as e:
+                logger.error(f"Error creating embeddings for bulk entries: {str(e)}")
+        return len(written)
+    
+    def _create_bulk_embeddings(self, written):
+        """Create embeddings for entries written by add_knowledge_bulk, replacing existing ones"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for table, name_field, row, content_id in written:
+                if content_id is None:
+                    content_id = conn.execute(
+                        f"SELECT id FROM {table} WHERE {name_field} = ?", (row[name_field],)
+                    ).fetchone()[0]
+                with conn:
+                    conn.execute(
+                        "DELETE FROM embeddings WHERE content_id = ? AND content_type = ?",
+                        (content_id, table)
+                    )
+                self._create_embedding(content_id, table, row)
+        finally:
+            conn.close()
+    
     def search_knowledge_base(self, query, category=None, limit=5):
         """
         Search the knowledge base for relevant information
@@ -452,7 +543,7 @@ class GameDesignKnowledgeBase:
             )
             
             if response.status_code == 200:
-                embedding = response.json()["data"][0]["embedding"]
+                embedding = orjson.loads(response.content)["data"][0]["embedding"]
                 
                 # Store embedding in database
                 conn = sqlite3.connect(self.db_path)
@@ -460,7 +551,7 @@ class GameDesignKnowledgeBase:
                 
                 cursor.execute(
                     "INSERT INTO embeddings (content_id, content_type, embedding) VALUES (?, ?, ?)",
-                    (content_id, content_type, json.dumps(embedding))
+                    (content_id, content_type, orjson.dumps(embedding).decode())
                 )
                 
                 conn.commit()
@@ -533,7 +624,7 @@ class GameDesignKnowledgeBase:
                 logger.error(f"Failed to get query embedding: {response.text}")
                 return self._keyword_search(query, category, limit)
             
-            query_embedding = response.json()["data"][0]["embedding"]
+            query_embedding = orjson.loads(response.content)["data"][0]["embedding"]
             
             # Load all embeddings
             conn = sqlite3.connect(self.db_path)
@@ -559,7 +650,7 @@ class GameDesignKnowledgeBase:
             for emb in embeddings:
                 content_id = emb["content_id"]
                 content_type = emb["content_type"]
-                embedding = np.array(json.loads(emb["embedding"]))
+                embedding = np.array(orjson.loads(emb["embedding"]))
                 
                 # Calculate similarity
                 similarity = 1 - cosine(query_embedding, embedding)
@@ -664,152 +755,47 @@ class GameDesignKnowledgeBase:
         return context
     
     def initialize_with_sample_data(self):
-        """Initialize the knowledge base with sample game design concepts"""
-        # Game Design Concepts
-        concepts = [
-            {
-                "concept_name": "Core Game Loop",
-                "description": "The central, repeatable activity that players engage with in a game. It defines the main gameplay experience and is typically the most refined and polished aspect of the game.",
-                "examples": json.dumps([
-                    "In Tetris, the core loop is rotating and placing falling blocks to clear lines",
-                    "In first-person shooters, the core loop is moving, aiming, and shooting",
-                    "In match-3 games, the core loop is swapping adjacent tiles to create matches"
-                ]),
-                "category": "Game Design Fundamentals",
-                "tags": "gameplay, mechanics, design"
-            },
-            {
-                "concept_name": "Player Retention",
-                "description": "The ability of a game to keep players engaged and returning over time. Strong retention is crucial for live service and free-to-play games' success.",
-                "examples": json.dumps([
-                    "Daily login rewards in mobile games",
-                    "Season passes in battle royale games",
-                    "Weekly challenges in live service games"
-                ]),
-                "category": "Monetization",
-                "tags": "metrics, engagement, monetization"
-            },
-            {
-                "concept_name": "Game Balance",
-                "description": "The practice of tuning a game's systems and mechanics to ensure fair, engaging gameplay without dominant strategies or unintended advantages.",
-                "examples": json.dumps([
-                    "Balancing character abilities in MOBAs",
-                    "Weapon statistics in shooters",
-                    "Resource generation rates in strategy games"
-                ]),
-                "category": "Game Design Fundamentals",
-                "tags": "mechanics, tuning, design"
-            }
-        ]
-        
-        for concept in concepts:
-            self.add_design_concept(concept)
-        
-        # Industry Practices
-        practices = [
-            {
-                "practice_name": "Agile Game Development",
-                "description": "An iterative approach to game development that emphasizes flexibility, continuous testing, and regular deliverables.",
-                "implementation": "Typically implemented using Scrum or Kanban methodologies with 2-4 week sprints.",
-                "benefits": "Faster iteration, better risk management, more responsive to player feedback.",
-                "challenges": "Difficulty in estimating completion dates, potential scope creep, requires strong team coordination.",
-                "case_studies": json.dumps([
-                    "Ubisoft's transition to Agile for Assassin's Creed franchise",
-                    "How Bungie uses Agile for Destiny's live service model"
-                ]),
-                "category": "Project Management",
-                "tags": "development, methodology, production"
-            },
-            {
-                "practice_name": "Minimum Viable Product (MVP) Approach",
-                "description": "Creating a version of a game with just enough features to be playable and test core assumptions before investing in full production.",
-                "implementation": "Start with core gameplay loop only, focus on what makes the game unique, eliminate all non-essential features.",
-                "benefits": "Reduces initial development costs, allows for early player feedback, identifies design issues early.",
-                "challenges": "Difficult to determine what's truly 'minimum', players may judge harshly if too limited.",
-                "category": "Project Management",
-                "tags": "development, production, prototyping"
-            }
-        ]
-        
-        for practice in practices:
-            self.add_industry_practice(practice)
-        
-        # Educational Resources
-        resources = [
-            {
-                "title": "The Art of Game Design: A Book of Lenses",
-                "content_type": "Book",
-                "description": "A comprehensive guide to game design by Jesse Schell that provides multiple perspectives or 'lenses' through which to view and improve game designs.",
-                "author": "Jesse Schell",
-                "publication_date": "2008",
-                "key_points": json.dumps([
-                    "100+ 'lenses' for analyzing game design",
-                    "Focus on player experience over mechanics",
-                    "Balance between analytical and creative approaches",
-                    "Universal principles applicable to all game types"
-                ]),
-                "category": "Game Design",
-                "tags": "design, fundamentals, theory"
-            },
-            {
-                "title": "GDC Game Design Workshop: Balancing Competitive Multiplayer Games",
-                "content_type": "Conference Talk",
-                "description": "Game Developers Conference presentation on techniques for balancing competitive games to ensure fairness and strategic depth.",
-                "url": "https://www.gdcvault.com/",
-                "author": "Various Industry Experts",
-                "key_points": json.dumps([
-                    "Asymmetric vs. symmetric balance approaches",
-                    "Data-driven balance methodologies",
-                    "Community feedback integration techniques",
-                    "Common balance pitfalls and how to avoid them"
-                ]),
-                "category": "Game Balance",
-                "tags": "multiplayer, competitive, balance"
-            }
-        ]
-        
-        for resource in resources:
-            self.add_educational_resource(resource)
-        
-        # Market Research
-        research = [
-            {
-                "title": "Mobile Gaming Trends 2023",
-                "game_genre": "Multiple",
-                "platform": "Mobile",
-                "target_audience": "Casual and mid-core players",
-                "key_findings": "Hybrid-casual games are seeing strong growth, combining casual mechanics with deeper progression systems. Battle passes continue to outperform traditional gacha mechanics in terms of player satisfaction.",
-                "metrics": json.dumps({
-                    "average_revenue_per_daily_active_user": "$0.58",
-                    "day_1_retention_benchmark": "35%",
-                    "day_30_retention_benchmark": "8%"
-                }),
-                "trends": "Shift towards more accessible midcore experiences, rise of alternative app stores, increasing importance of IP-based games",
-                "date_of_research": "2023-01-15",
-                "source": "Industry Report"
-            },
-            {
-                "title": "Player Motivations in Battle Royale Games",
-                "game_genre": "Battle Royale",
-                "platform": "Cross-platform",
-                "target_audience": "Competitive players aged 16-34",
-                "key_findings": "The primary appeal for most players is not winning but the 'high tension moments' created by the shrinking playspace and unexpected encounters. Social features are increasingly important for retention.",
-                "metrics": json.dumps({
-                    "average_session_length": "22 minutes",
-                    "matches_per_day_per_active_user": "4.7",
-                    "cosmetic_conversion_rate": "12%"
-                }),
-                "trends": "Integration with social platforms, emphasis on squad-based play, expansion of non-combat activities within games",
-                "date_of_research": "2022-09-30",
-                "source": "Player Motivation Study"
-            }
-        ]
+        """
+        Initialize the knowledge base with sample game design knowledge
+
+        Seed entries from services/kb_seed that are missing are added and those whose
+        stored content differs from the seed file are updated; entries that are already
+        up to date are left alone, so re-running this costs no writes or embeddings.
+        """
+        missing = {}
+        changed = []
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            for seed_name, (table, name_field) in SEED_CATEGORIES.items():
+                stored = {row[name_field]: dict(row) for row in conn.execute(f"SELECT * FROM {table}")}
+                for name, entry in _load_seed_file(seed_name).items():
+                    row = _serialize_json_fields(entry)
+                    if name not in stored:
+                        missing.setdefault(table, []).append(entry)
+                    elif any(stored[name].get(field) != value for field, value in row.items()):
+                        changed.append((table, name_field, row, None))
+            
+            # Market research has no unique name to upsert on, so changed seed
+            # entries are updated by name directly
+            with conn:
+                for table, name_field, row, _ in changed:
+                    fields = [field for field in row if field != name_field]
+                    conn.execute(
+                        f"UPDATE {table} SET {', '.join(f'{field} = ?' for field in fields)} WHERE {name_field} = ?",
+                        [row[field] for field in fields] + [row[name_field]]
+                    )
+        finally:
+            conn.close()
         
-        for research_item in research:
-            self.add_market_research(research_item)
+        if changed and self.openai_api_key:
+            try:
+                self._create_bulk_embeddings(changed)
+            except sqlite3.Error as e:
+                logger.error(f"Error creating embeddings for updated sample data: {str(e)}")
         
-        logger.info("Knowledge base initialized with sample data")
-
+        added = self.add_knowledge_bulk(missing) if missing else 0
+        logger.info(f"Knowledge base initialized with sample data ({added} new, {len(changed)} updated entries)")
 
 # Helper function to get the knowledge base instance
 _knowledge_base_instance = None
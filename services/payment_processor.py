@@ -1,69 +1,186 @@
 import os
 import requests
 import json
-from datetime import datetime
+import logging
+import orjson
+import threading
+import time
+from random import choice as _choice, randint as _randint
+from datetime import datetime, timedelta
 import uuid
 from dotenv import load_dotenv
 
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger("payment_processor")
+
+# PayPal access tokens are shared between processes through this file
+PAYPAL_TOKEN_CACHE = os.path.expanduser(
+    os.getenv("PAYPAL_TOKEN_CACHE", "~/.cache/thomas_ai/paypal_token.json")
+)
+# Tokens expiring within this many seconds are refreshed in the background
+TOKEN_REFRESH_WINDOW = 300
+# Tokens expiring within this many seconds are no longer handed out
+TOKEN_MIN_LIFETIME = 60
+
+PAYOUT_EMAIL_SUBJECT = "Payment from Your Company"
+
+# Simulated crypto transaction statuses
+CRYPTO_TRANSACTION_STATUSES = ("pending", "confirmed", "completed", "failed")
+
 class PayPalProcessor:
     def __init__(self):
         self.client_id = os.getenv("PAYPAL_CLIENT_ID")
         self.client_secret = os.getenv("PAYPAL_CLIENT_SECRET")
         self.base_url = "https://api-m.sandbox.paypal.com" if os.getenv("PAYPAL_SANDBOX", "true").lower() == "true" else "https://api-m.paypal.com"
         self.access_token = None
-        self.token_expiry = None
+        self.token_expiry = 0
+        self._refresh_lock = threading.Lock()
+        # (token, headers) for the token the headers were built with
+        self._headers = (None, None)
     
     def _get_access_token(self):
-        """Get OAuth access token from PayPal"""
-        if self.access_token and self.token_expiry and self.token_expiry > datetime.now():
-            return self.access_token
-        
-        url = f"{self.base_url}/v1/oauth2/token"
-        headers = {
-            "Accept": "application/json",
-            "Accept-Language": "en_US"
-        }
-        data = {
-            "grant_type": "client_credentials"
-        }
-        
-        response = requests.post(
-            url, 
-            auth=(self.client_id, self.client_secret),
-            headers=headers,
-            data=data
-        )
+        """
+        Get OAuth access token from PayPal
+
+        Tokens are cached on disk and shared between processes. A token that is
+        about to expire is still returned while a background thread refreshes it,
+        so only a missing or expired token blocks on the OAuth request.
+        """
+        if not self._token_is_fresh():
+            self._load_cached_token()
         
-        if response.status_code == 200:
-            token_data = response.json()
+        remaining = self.token_expiry - time.time() if self.access_token else 0
+        if remaining > TOKEN_REFRESH_WINDOW:
+            return self.access_token
+        if remaining > TOKEN_MIN_LIFETIME:
+            token = self.access_token
+            self._refresh_token_in_background()
+            return token
+        return self._refresh_token()
+    
+    def _auth_headers(self):
+        """Request headers for the current access token, rebuilt only when the token changes"""
+        token = self._get_access_token()
+        headers_token, headers = self._headers
+        if headers_token != token:
+            headers = {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {token}"
+            }
+            self._headers = (token, headers)
+        return headers
+    
+    def warmup(self):
+        """Fetch an access token in the background so the first payout doesn't wait on OAuth"""
+        if not (self.client_id and self.client_secret):
+            return
+        threading.Thread(target=self._warmup_token, daemon=True).start()
+    
+    def _warmup_token(self):
+        try:
+            self._get_access_token()
+            logger.info("PayPal access token pre-warmed")
+        except Exception as e:
+            logger.warning(f"Could not pre-warm PayPal access token: {str(e)}")
+    
+    def _token_is_fresh(self):
+        """Whether the in-memory token is outside the refresh window"""
+        return bool(self.access_token) and self.token_expiry - time.time() > TOKEN_REFRESH_WINDOW
+    
+    def _refresh_token_in_background(self):
+        """Start a token refresh unless one is already running"""
+        if self._refresh_lock.locked():
+            return
+        threading.Thread(target=self._refresh_token, daemon=True).start()
+    
+    def _refresh_token(self):
+        """Request a new OAuth access token and store it in the token cache"""
+        with self._refresh_lock:
+            # Another thread may have refreshed the token while we waited
+            if self._token_is_fresh():
+                return self.access_token
+            
+            url = f"{self.base_url}/v1/oauth2/token"
+            headers = {
+                "Accept": "application/json",
+                "Accept-Language": "en_US"
+            }
+            data = {
+                "grant_type": "client_credentials"
+            }
+            
+            response = requests.post(
+                url, 
+                auth=(self.client_id, self.client_secret),
+                headers=headers,
+                data=data
+            )
+            
+            if response.status_code != 200:
+                raise Exception(f"Failed to get PayPal access token: {response.text}")
+            
+            token_data = orjson.loads(response.content)
             self.access_token = token_data["access_token"]
-            # Set expiry time (subtract 60 seconds to be safe)
-            expires_in = token_data["expires_in"] - 60
-            self.token_expiry = datetime.now() + datetime.timedelta(seconds=expires_in)
+            self.token_expiry = time.time() + token_data["expires_in"]
+            self._save_cached_token()
             return self.access_token
-        else:
-            raise Exception(f"Failed to get PayPal access token: {response.text}")
+    
+    def _load_cached_token(self):
+        """Adopt the token from the cache file if it belongs to these credentials"""
+        try:
+            with open(PAYPAL_TOKEN_CACHE, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        if cached.get("client_id") != self.client_id or cached.get("base_url") != self.base_url:
+            return
+        if cached.get("expires_at", 0) > (self.token_expiry or 0):
+            self.access_token = cached["access_token"]
+            self.token_expiry = cached["expires_at"]
+    
+    def _save_cached_token(self):
+        """Atomically write the current token to the cache file"""
+        cached = {
+            "client_id": self.client_id,
+            "base_url": self.base_url,
+            "access_token": self.access_token,
+            "expires_at": self.token_expiry
+        }
+        tmp_path = f"{PAYPAL_TOKEN_CACHE}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(PAYPAL_TOKEN_CACHE), exist_ok=True)
+            with open(f"{PAYPAL_TOKEN_CACHE}.lock", "w") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(cached, f)
+                os.replace(tmp_path, PAYPAL_TOKEN_CACHE)
+        except OSError as e:
+            logger.warning(f"Could not write PayPal token cache: {str(e)}")
     
     def create_payment(self, amount, currency, employee_id, description=None):
         """Create a PayPal payout to an employee's PayPal email"""
-        token = self._get_access_token()
+        headers = self._auth_headers()
         
-        # Generate a unique batch ID for this payout
-        batch_id = f"THOMAS_PAYOUT_{str(uuid.uuid4())[:8]}"
+        # Generate unique batch and item IDs for this payout from one UUID
+        unique_id = uuid.uuid4().hex
+        batch_id = f"THOMAS_PAYOUT_{unique_id[:8]}"
         
         url = f"{self.base_url}/v1/payments/payouts"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {token}"
-        }
         
         payload = {
             "sender_batch_header": {
                 "sender_batch_id": batch_id,
-                "email_subject": "Payment from Your Company",
+                "email_subject": PAYOUT_EMAIL_SUBJECT,
                 "email_message": description or f"Payment of {amount} {currency} from Your Company"
             },
             "items": [
@@ -75,18 +192,19 @@ class PayPalProcessor:
                     },
                     "note": f"Payment for employee {employee_id}",
                     "receiver": employee_id,  # Assuming employee_id is the PayPal email
-                    "sender_item_id": f"PAYMENT_{str(uuid.uuid4())[:8]}"
+                    "sender_item_id": f"PAYMENT_{unique_id[8:16]}"
                 }
             ]
         }
         
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
+        response = requests.post(url, headers=headers, data=orjson.dumps(payload))
         
         if response.status_code in (200, 201):
+            batch_header = orjson.loads(response.content).get("batch_header", {})
             return {
                 "success": True,
-                "payout_batch_id": response.json().get("batch_header", {}).get("payout_batch_id"),
-                "status": response.json().get("batch_header", {}).get("batch_status")
+                "payout_batch_id": batch_header.get("payout_batch_id"),
+                "status": batch_header.get("batch_status")
             }
         else:
             return {
@@ -96,21 +214,15 @@ class PayPalProcessor:
     
     def get_payment_status(self, payout_batch_id):
         """Check the status of a payout"""
-        token = self._get_access_token()
-        
         url = f"{self.base_url}/v1/payments/payouts/{payout_batch_id}"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {token}"
-        }
-        
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=self._auth_headers())
         
         if response.status_code == 200:
+            details = orjson.loads(response.content)
             return {
                 "success": True,
-                "status": response.json().get("batch_header", {}).get("batch_status"),
-                "details": response.json()
+                "status": details.get("batch_header", {}).get("batch_status"),
+                "details": details
             }
         else:
             return {
@@ -129,18 +241,23 @@ class CryptoProcessor:
         Generate a simulated crypto payment request
         In a real implementation, this would create a request with an actual crypto wallet
         """
-        if currency.lower() not in ("btc", "eth", "usdt"):
+        currency_code = currency.lower()
+        if currency_code not in ("btc", "eth", "usdt"):
             raise ValueError(f"Unsupported cryptocurrency: {currency}")
         
+        # A single random read supplies both the transaction ID (8 bytes) and
+        # a simulated wallet address (up to 20 bytes)
+        random_bytes = os.urandom(28)
+        
         # Generate a simulated wallet address if none provided
         if not wallet_address:
-            if currency.lower() == "btc":
-                wallet_address = f"bc1q{uuid.uuid4().hex[:34]}"
-            elif currency.lower() == "eth":
-                wallet_address = f"0x{uuid.uuid4().hex[:40]}"
+            if currency_code == "btc":
+                wallet_address = f"bc1q{random_bytes[8:25].hex()}"
+            elif currency_code == "eth":
+                wallet_address = f"0x{random_bytes[8:28].hex()}"
         
         # Generate a fake transaction ID
-        transaction_id = f"{currency.lower()}_tx_{uuid.uuid4().hex[:16]}"
+        transaction_id = f"{currency_code}_tx_{random_bytes[:8].hex()}"
         
         return {
             "payment_address": wallet_address,
@@ -149,7 +266,7 @@ class CryptoProcessor:
             "transaction_id": transaction_id,
             "status": "pending",
             "instructions": f"Please send {amount} {currency.upper()} to {wallet_address}",
-            "expiry": (datetime.now() + datetime.timedelta(hours=24)).isoformat()
+            "expiry": (datetime.now() + timedelta(hours=24)).isoformat()
         }
     
     def check_transaction_status(self, transaction_id):
@@ -158,13 +275,11 @@ class CryptoProcessor:
         In a real implementation, this would query the blockchain or a crypto payment provider
         """
         # Simulate random status for demo purposes
-        import random
-        statuses = ["pending", "confirmed", "completed", "failed"]
-        status = random.choice(statuses)
+        status = _choice(CRYPTO_TRANSACTION_STATUSES)
         
         return {
             "transaction_id": transaction_id,
             "status": status,
-            "confirmations": random.randint(0, 6) if status != "failed" else 0,
+            "confirmations": _randint(0, 6) if status != "failed" else 0,
             "checked_at": datetime.now().isoformat()
         } 
\ No newline at end of file
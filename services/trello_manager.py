@@ -1,92 +1,101 @@
-import requests
-import json
+import orjson
+import urllib3
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
+
+# Maximum number of checklist items created in parallel
+CHECKLIST_ITEM_WORKERS = 8
+# Maximum number of cards / member invites sent in parallel by setup_game_project_board
+BOARD_SETUP_WORKERS = 10
 
 class TrelloManager:
     def __init__(self, api_key, token):
         self.api_key = api_key
         self.token = token
         self.base_url = "https://api.trello.com/1"
+        # Auth params shared by every request, plus their pre-encoded form
+        self._auth = {'key': api_key, 'token': token}
+        self._auth_qs = urlencode(self._auth)
+        # board_id -> {label_name: label_id}
+        self._board_labels_cache = {}
+        # list_id -> board_id
+        self._list_board_cache = {}
+        # Connection pool shared by all requests (thread-safe, keeps connections alive)
+        self._pool = urllib3.PoolManager(
+            num_pools=4,
+            maxsize=20,
+            retries=urllib3.Retry(3, backoff_factor=0.2)
+        )
         
     def create_board(self, name, description=None, default_lists=True):
         """Create a new Trello board with optional default lists."""
         url = f"{self.base_url}/boards"
-        query = {
+        query = self._auth | {
             'name': name,
             'desc': description or "",
-            'defaultLists': default_lists,
-            'key': self.api_key,
-            'token': self.token
+            'defaultLists': default_lists
         }
-        response = requests.post(url, params=query)
-        return response.json()
+        response = self._request("POST", url, query)
+        return orjson.loads(response.data)
     
     def create_list(self, board_id, name, position="bottom"):
         """Create a new list on a board."""
         url = f"{self.base_url}/lists"
-        query = {
+        query = self._auth | {
             'name': name,
             'idBoard': board_id,
-            'pos': position,
-            'key': self.api_key,
-            'token': self.token
+            'pos': position
         }
-        response = requests.post(url, params=query)
-        return response.json()
+        response = self._request("POST", url, query)
+        list_data = orjson.loads(response.data)
+        if 'id' in list_data:
+            self._list_board_cache[list_data['id']] = board_id
+        return list_data
     
-    def create_card(self, list_id, name, description=None, due_date=None, labels=None):
+    def create_card(self, list_id, name, description=None, due_date=None, labels=None, position="bottom"):
         """Create a new card in a list."""
         url = f"{self.base_url}/cards"
-        query = {
+        query = self._auth | {
             'name': name,
             'desc': description or "",
             'idList': list_id,
-            'key': self.api_key,
-            'token': self.token
+            'pos': position
         }
         
         if due_date:
             query['due'] = due_date
-            
-        response = requests.post(url, params=query)
-        card_data = response.json()
         
-        # Add labels if provided
-        if labels and 'id' in card_data:
-            for label in labels:
-                self.add_label_to_card(card_data['id'], label)
-                
-        return card_data
+        # Attach known labels in the same request instead of one POST per label
+        if labels:
+            board_labels = self._get_board_label_ids(self._get_list_board_id(list_id))
+            label_ids = [board_labels[label] for label in labels if label in board_labels]
+            if label_ids:
+                query['idLabels'] = ",".join(label_ids)
+            
+        response = self._request("POST", url, query)
+        return orjson.loads(response.data)
     
     def add_member_to_board(self, board_id, email):
         """Add a member to a board using their email."""
         url = f"{self.base_url}/boards/{board_id}/members"
-        query = {
+        query = self._auth | {
             'email': email,
-            'type': 'normal',
-            'key': self.api_key,
-            'token': self.token
+            'type': 'normal'
         }
-        response = requests.put(url, params=query)
-        return response.json()
+        response = self._request("PUT", url, query)
+        return orjson.loads(response.data)
     
-    def add_label_to_card(self, card_id, label_name, color=None):
+    def add_label_to_card(self, card_id, label_name, color=None, board_id=None):
         """Add a label to a card."""
-        # First, get available labels on the board
-        card_info = self.get_card(card_id)
-        if not card_info.get('id'):
-            return {"error": "Card not found"}
-        
-        board_id = card_info.get('idBoard')
-        
-        # Get labels for this board
-        labels = self.get_board_labels(board_id)
+        # Look up the card's board only if the caller doesn't know it
+        if not board_id:
+            card_info = self.get_card(card_id)
+            if not card_info.get('id'):
+                return {"error": "Card not found"}
+            board_id = card_info.get('idBoard')
         
         # Find matching label
-        label_id = None
-        for label in labels:
-            if label.get('name') == label_name:
-                label_id = label.get('id')
-                break
+        label_id = self._get_board_label_ids(board_id).get(label_name)
         
         # If no matching label exists and color is provided, create one
         if not label_id and color:
@@ -99,127 +108,140 @@ class TrelloManager:
         
         # Add the label to the card
         url = f"{self.base_url}/cards/{card_id}/idLabels"
-        query = {
-            'value': label_id,
-            'key': self.api_key,
-            'token': self.token
+        query = self._auth | {
+            'value': label_id
         }
-        response = requests.post(url, params=query)
-        return response.json()
+        response = self._request("POST", url, query)
+        return orjson.loads(response.data)
+
+    def _request(self, method, url, query=None):
+        """Send a request through the connection pool; query defaults to the auth params."""
+        query_string = self._auth_qs if query is None else urlencode(query)
+        return self._pool.request(method, f"{url}?{query_string}")
+
+    def warmup(self, board_ids):
+        """Populate the label cache for the given boards concurrently."""
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(self._get_board_label_ids, board_ids))
+
+    def _get_board_label_ids(self, board_id):
+        """Get a cached {label_name: label_id} mapping for a board."""
+        if board_id not in self._board_labels_cache:
+            labels = self.get_board_labels(board_id)
+            self._board_labels_cache[board_id] = {
+                label['name']: label['id'] for label in labels if label.get('name')
+            }
+        return self._board_labels_cache[board_id]
+
+    def _get_list_board_id(self, list_id):
+        """Get the (cached) board ID that a list belongs to."""
+        if list_id not in self._list_board_cache:
+            self._list_board_cache[list_id] = self.get_list(list_id).get('idBoard')
+        return self._list_board_cache[list_id]
 
     def get_card(self, card_id):
         """Get card details."""
         url = f"{self.base_url}/cards/{card_id}"
-        query = {
-            'key': self.api_key,
-            'token': self.token
-        }
-        response = requests.get(url, params=query)
-        return response.json()
+        response = self._request("GET", url)
+        return orjson.loads(response.data)
+
+    def get_list(self, list_id):
+        """Get list details."""
+        url = f"{self.base_url}/lists/{list_id}"
+        response = self._request("GET", url)
+        return orjson.loads(response.data)
 
     def get_board_labels(self, board_id):
         """Get all labels for a board."""
         url = f"{self.base_url}/boards/{board_id}/labels"
-        query = {
-            'key': self.api_key,
-            'token': self.token
-        }
-        response = requests.get(url, params=query)
-        return response.json()
+        response = self._request("GET", url)
+        return orjson.loads(response.data)
 
     def create_label(self, board_id, name, color):
         """Create a new label on a board."""
         url = f"{self.base_url}/boards/{board_id}/labels"
-        query = {
+        query = self._auth | {
             'name': name,
-            'color': color,
-            'key': self.api_key,
-            'token': self.token
+            'color': color
         }
-        response = requests.post(url, params=query)
-        return response.json()
+        response = self._request("POST", url, query)
+        label = orjson.loads(response.data)
+        if board_id in self._board_labels_cache and label.get('id'):
+            self._board_labels_cache[board_id][name] = label['id']
+        return label
 
     def move_card(self, card_id, list_id):
         """Move a card to a different list."""
         url = f"{self.base_url}/cards/{card_id}"
-        query = {
-            'idList': list_id,
-            'key': self.api_key,
-            'token': self.token
+        query = self._auth | {
+            'idList': list_id
         }
-        response = requests.put(url, params=query)
-        return response.json()
+        response = self._request("PUT", url, query)
+        return orjson.loads(response.data)
 
     def add_checklist_to_card(self, card_id, title, items):
         """Add a checklist with items to a card."""
         # Create checklist
         url = f"{self.base_url}/cards/{card_id}/checklists"
-        query = {
-            'name': title,
-            'key': self.api_key,
-            'token': self.token
+        query = self._auth | {
+            'name': title
         }
-        response = requests.post(url, params=query)
+        response = self._request("POST", url, query)
         
-        if response.status_code != 200:
+        if response.status != 200:
             return {"error": "Failed to create checklist"}
         
-        checklist_id = response.json().get('id')
+        checklist_id = orjson.loads(response.data).get('id')
         
-        # Add items to checklist
-        results = []
-        for item in items:
-            item_response = self.add_checklist_item(checklist_id, item)
-            results.append(item_response)
+        # Add items concurrently; explicit positions keep them in the given order
+        with ThreadPoolExecutor(max_workers=CHECKLIST_ITEM_WORKERS) as executor:
+            results = list(executor.map(
+                lambda item, position: self.add_checklist_item(checklist_id, item, position),
+                items,
+                range(1, len(items) + 1)
+            ))
         
         return {
             "checklist_id": checklist_id,
             "items": results
         }
 
-    def add_checklist_item(self, checklist_id, name):
+    def add_checklist_item(self, checklist_id, name, position="bottom"):
         """Add an item to a checklist."""
         url = f"{self.base_url}/checklists/{checklist_id}/checkItems"
-        query = {
+        query = self._auth | {
             'name': name,
-            'key': self.api_key,
-            'token': self.token
+            'pos': position
         }
-        response = requests.post(url, params=query)
-        return response.json()
+        response = self._request("POST", url, query)
+        return orjson.loads(response.data)
 
     def get_board_lists(self, board_id):
         """Get all lists on a board."""
         url = f"{self.base_url}/boards/{board_id}/lists"
-        query = {
-            'key': self.api_key,
-            'token': self.token
-        }
-        response = requests.get(url, params=query)
-        return response.json()
+        response = self._request("GET", url)
+        return orjson.loads(response.data)
 
     def get_list_cards(self, list_id):
         """Get all cards in a list."""
         url = f"{self.base_url}/lists/{list_id}/cards"
-        query = {
-            'key': self.api_key,
-            'token': self.token
-        }
-        response = requests.get(url, params=query)
-        return response.json()
+        response = self._request("GET", url)
+        return orjson.loads(response.data)
 
     def create_webhook(self, callback_url, id_model, description=None):
         """Create a webhook for a board, list, or card."""
         url = f"{self.base_url}/webhooks"
-        payload = {
+        payload = self._auth | {
             'callbackURL': callback_url,
             'idModel': id_model,
-            'description': description or f"Webhook for {id_model}",
-            'key': self.api_key,
-            'token': self.token
+            'description': description or f"Webhook for {id_model}"
         }
-        response = requests.post(url, json=payload)
-        return response.json()
+        response = self._pool.request(
+            "POST", url,
+            body=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"}
+        )
+        return orjson.loads(response.data)
 
 # Usage example
 def setup_game_project_board(project_name, features, team_members):
@@ -235,17 +257,32 @@ def setup_game_project_board(project_name, features, team_members):
         list_data = trello.create_list(board_id, list_name)
         lists[list_name] = list_data['id']
     
-    # Create feature cards
-    for feature in features:
-        trello.create_card(
-            lists["Backlog"],
-            feature["name"],
-            description=feature["description"],
-            labels=feature["labels"]
-        )
+    # Labels are resolved from the board's label cache; fill it once up front
+    # rather than letting every card thread fetch it
+    if any(feature.get("labels") for feature in features):
+        trello.warmup([board_id])
     
-    # Add team members to board
-    for member in team_members:
-        trello.add_member_to_board(board_id, member["email"])
+    with ThreadPoolExecutor(max_workers=BOARD_SETUP_WORKERS) as executor:
+        # Create feature cards; explicit positions keep the given order
+        card_futures = [
+            executor.submit(
+                trello.create_card,
+                lists["Backlog"],
+                feature["name"],
+                description=feature["description"],
+                labels=feature["labels"],
+                position=position
+            )
+            for position, feature in enumerate(features, start=1)
+        ]
+        
+        # Add team members to board
+        member_futures = [
+            executor.submit(trello.add_member_to_board, board_id, member["email"])
+            for member in team_members
+        ]
+        
+        for future in card_futures + member_futures:
+            future.result()
     
     return board_id 
\ No newline at end of file
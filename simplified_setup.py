@@ -13,6 +13,11 @@ def create_database():
     # If the file doesn't exist, create it
     if not os.path.exists(db_path):
         conn = sqlite3.connect(db_path)
+        # page_size only takes effect before the first table is created, and WAL
+        # mode is recorded in the file header, so both persist for every later
+        # connection. Per-connection settings are applied in database/db_manager.py.
+        conn.execute("PRAGMA page_size=8192")
+        conn.execute("PRAGMA journal_mode=WAL")
         conn.close()
         print("Database file created successfully")
     else:
@@ -1,34 +1,45 @@
 import requests
+from concurrent.futures import ThreadPoolExecutor
+
+def probe(url):
+    """GET a URL, returning the response or the connection error"""
+    try:
+        return requests.get(url, timeout=5)
+    except requests.exceptions.RequestException as e:
+        return e
+
+# Probe everything at once so unreachable servers cost one timeout, not three
+with ThreadPoolExecutor(max_workers=3) as executor:
+    root_response, projects_response, dashboard_response = executor.map(probe, [
+        "http://localhost:8000/",
+        "http://localhost:8000/projects/",
+        "http://localhost:8501",
+    ])
 
 # Test API server
 print("Testing API server...")
-try:
-    response = requests.get("http://localhost:8000/", timeout=5)
-    if response.status_code == 200:
-        print(f"✅ API root endpoint is running.")
-        print(f"Response: {response.json()}")
-    else:
-        print(f"❌ API root endpoint returned error {response.status_code}")
-except requests.exceptions.RequestException as e:
-    print(f"❌ Could not connect to API server: {e}")
+if isinstance(root_response, Exception):
+    print(f"❌ Could not connect to API server: {root_response}")
+elif root_response.status_code == 200:
+    print(f"✅ API root endpoint is running.")
+    print(f"Response: {root_response.json()}")
+else:
+    print(f"❌ API root endpoint returned error {root_response.status_code}")
 
 print("\nTesting API projects endpoint...")
-try:
-    response = requests.get("http://localhost:8000/projects/", timeout=5)
-    if response.status_code == 200:
-        print(f"✅ Projects endpoint is running. Found {len(response.json())} projects.")
-    else:
-        print(f"❌ Projects endpoint returned error {response.status_code}")
-except requests.exceptions.RequestException as e:
-    print(f"❌ Could not connect to projects endpoint: {e}")
+if isinstance(projects_response, Exception):
+    print(f"❌ Could not connect to projects endpoint: {projects_response}")
+elif projects_response.status_code == 200:
+    print(f"✅ Projects endpoint is running. Found {len(projects_response.json())} projects.")
+else:
+    print(f"❌ Projects endpoint returned error {projects_response.status_code}")
 
 # Test Dashboard
 print("\nTesting Streamlit Dashboard...")
-try:
-    response = requests.get("http://localhost:8501", timeout=5)
+if isinstance(dashboard_response, Exception):
+    print(f"❌ Could not connect to Streamlit dashboard: {dashboard_response}")
+else:
     print(f"✅ Streamlit dashboard appears to be running at http://localhost:8501")
-except requests.exceptions.RequestException as e:
-    print(f"❌ Could not connect to Streamlit dashboard: {e}")
 
 print("\nIf all tests passed, the system is operational!")
 print("If any test failed, check that the corresponding server is running.")
@@ -0,0 +1,213 @@
+import io
+import logging
+import string
+import zipfile
+
+import docx
+import pytest
+
+import ui.document_uploader as document_uploader
+from ui.document_uploader import extract_text_from_docx, merge_knowledge, parse_json_object, split_text
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """Shrink the chunking limits so boundaries are easy to check by hand"""
+    monkeypatch.setattr(document_uploader, "ANALYSIS_CHUNK_SIZE", 20)
+    monkeypatch.setattr(document_uploader, "ANALYSIS_CHUNK_OVERLAP", 4)
+    monkeypatch.setattr(document_uploader, "MAX_ANALYSIS_CHUNKS", 3)
+
+def letters(n):
+    """n characters with no whitespace, each position easy to tell apart"""
+    return "".join(string.ascii_letters[i % len(string.ascii_letters)] for i in range(n))
+
+def test_short_text_is_one_chunk(small_chunks):
+    assert split_text("short text") == ["short text"]
+
+def test_text_of_exactly_one_chunk(small_chunks):
+    text = letters(20)
+    assert split_text(text) == [text]
+
+def test_chunks_overlap(small_chunks):
+    text = letters(50)
+    assert split_text(text) == [text[0:20], text[16:36], text[32:50]]
+
+def test_chunk_ends_at_whitespace_in_second_half(small_chunks):
+    text = "aaaa bbbb cccc dddd eeee ffff"
+    chunks = split_text(text)
+    # The last space before 20 is at 19; the next chunk starts 4 characters earlier
+    assert chunks[0] == "aaaa bbbb cccc dddd"
+    assert chunks[1].startswith(text[15:19])
+    assert chunks[-1].endswith("ffff")
+
+def test_whitespace_in_first_half_is_ignored(small_chunks):
+    text = "aaaa " + letters(45)
+    # The only space is before the second half of the chunk, so it is cut at full size
+    assert split_text(text)[0] == text[:20]
+
+def test_chunks_are_capped(small_chunks, caplog):
+    text = letters(200)
+    with caplog.at_level(logging.WARNING, logger=document_uploader.logger.name):
+        chunks = split_text(text)
+    assert chunks == [text[0:20], text[16:36], text[32:52]]
+    assert "first 52 characters" in caplog.text
+
+def test_no_warning_when_text_fits(small_chunks, caplog):
+    with caplog.at_level(logging.WARNING, logger=document_uploader.logger.name):
+        split_text(letters(50))
+    assert caplog.text == ""
+
+def test_merge_drops_repeated_names_across_chunks():
+    merged = merge_knowledge([
+        {"design_concepts": [{"name": "Core Loop", "description": "first"}]},
+        {"design_concepts": [{"name": " core loop ", "description": "second"}, {"name": "Meta Game"}]},
+    ])
+    assert merged == {"design_concepts": [{"name": "Core Loop", "description": "first"}, {"name": "Meta Game"}]}
+
+def test_merge_dedupes_titles_per_category():
+    merged = merge_knowledge([
+        {"educational_resources": [{"title": "GDC Talk"}], "market_research": [{"title": "GDC Talk"}]},
+        {"educational_resources": [{"title": "GDC talk"}]},
+    ])
+    assert merged == {
+        "educational_resources": [{"title": "GDC Talk"}],
+        "market_research": [{"title": "GDC Talk"}],
+    }
+
+def test_merge_keeps_unnamed_items_and_skips_malformed_ones():
+    merged = merge_knowledge([
+        {"design_concepts": [{"description": "no name"}, "not a dict"], "notes": "not a list"},
+        {"design_concepts": [{"description": "no name"}]},
+    ])
+    assert merged == {"design_concepts": [{"description": "no name"}, {"description": "no name"}]}
+
+def test_merge_returns_none_only_when_every_chunk_failed():
+    assert merge_knowledge([None, None]) is None
+    assert merge_knowledge([None, {"design_concepts": [{"name": "Core Loop"}]}]) == {
+        "design_concepts": [{"name": "Core Loop"}]
+    }
+    # A chunk that succeeded but found nothing is not a failure
+    assert merge_knowledge([None, {}]) == {}
+
+def test_parse_json_object_ignores_surrounding_prose():
+    assert parse_json_object(b'Here you go:\n{"design_concepts": []}\nThanks!') == {"design_concepts": []}
+
+def test_parse_json_object_falls_back_when_trailing_prose_has_braces():
+    content = b'{"design_concepts": [{"name": "Core Loop"}]}\nNote: see {appendix} for more.'
+    assert parse_json_object(content) == {"design_concepts": [{"name": "Core Loop"}]}
+
+def test_parse_json_object_without_json():
+    assert parse_json_object(b"No knowledge found.") is None
+    assert parse_json_object(b'{"unterminated": ') is None
+
+def docx_bytes(*paragraphs):
+    """A minimal DOCX file containing the given paragraphs"""
+    buffer = io.BytesIO()
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    document.save(buffer)
+    return buffer.getvalue()
+
+def test_extract_text_from_docx():
+    assert extract_text_from_docx(io.BytesIO(docx_bytes("Core loop", "Meta game"))) == "Core loop\nMeta game"
+
+def test_extract_text_from_malformed_docx_xml():
+    # A valid package whose main document part is not well-formed XML
+    source = zipfile.ZipFile(io.BytesIO(docx_bytes("Core loop")))
+    broken = io.BytesIO()
+    with zipfile.ZipFile(broken, "w") as package:
+        for name in source.namelist():
+            package.writestr(name, b"<w:document" if name == "word/document.xml" else source.read(name))
+    assert extract_text_from_docx(io.BytesIO(broken.getvalue())) == ""
+
+def test_extract_text_from_non_docx():
+    assert extract_text_from_docx(io.BytesIO(b"not a zip file")) == ""
+
+def test_single_chunk_analysis_drops_malformed_items(monkeypatch):
+    response = {"design_concepts": ["just a string", {"name": "Core Loop"}, {"name": "core loop"}]}
+    monkeypatch.setattr(document_uploader, "_request_analysis", lambda prompt, text, api_key, on_delta=None: response)
+    assert document_uploader.analyze_text_with_openai("short text", "key", "GDD") == {
+        "design_concepts": [{"name": "Core Loop"}]
+    }
+
+def test_single_chunk_analysis_failure(monkeypatch):
+    monkeypatch.setattr(document_uploader, "_request_analysis", lambda prompt, text, api_key, on_delta=None: None)
+    assert document_uploader.analyze_text_with_openai("short text", "key", "GDD") is None
+
+class RecordingKnowledgeBase:
+    """Stands in for GameDesignKnowledgeBase, recording what would be saved"""
+    def __init__(self):
+        self.entries = None
+
+    def add_knowledge_bulk(self, entries):
+        self.entries = entries
+        return sum(len(rows) for rows in entries.values())
+
+def test_save_skips_items_that_are_not_objects():
+    knowledge_base = RecordingKnowledgeBase()
+    count = document_uploader.save_extracted_knowledge(
+        {"design_concepts": ["just a string", {"name": "Core Loop", "description": "loop"}], "industry_practices": "none"},
+        knowledge_base
+    )
+    assert count == 1
+    assert list(knowledge_base.entries) == ["game_design_concepts"]
+    assert knowledge_base.entries["game_design_concepts"][0]["concept_name"] == "Core Loop"
+
+def test_save_clears_cached_searches(monkeypatch):
+    cleared = []
+    monkeypatch.setattr(document_uploader.search_knowledge, "clear", lambda: cleared.append(True))
+    document_uploader.save_extracted_knowledge({"design_concepts": [{"name": "Core Loop"}]}, RecordingKnowledgeBase())
+    assert cleared
+
+requires_pdfium = pytest.mark.skipif(document_uploader.pdfium is None, reason="pypdfium2 is not installed")
+
+def pdf_bytes(*pages):
+    """A minimal PDF with one line of Helvetica text per page"""
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % i for i in page_ids) + b"] /Count %d >>" % len(pages),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for page_id, text in zip(page_ids, pages):
+        stream = b"BT /F1 12 Tf 72 720 Td (" + text.encode() + b") Tj ET"
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (page_id + 1)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def page_lines(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+@requires_pdfium
+def test_pdfium_extracts_short_pdf_in_process():
+    text = document_uploader.extract_text_from_pdf(pdf_bytes("Core loop", "Meta game"))
+    assert page_lines(text) == ["Core loop", "Meta game"]
+
+@requires_pdfium
+def test_pdfium_splits_long_pdf_across_worker_processes(monkeypatch):
+    # One page per worker, two workers, through the real spawn pool
+    monkeypatch.setattr(document_uploader, "PARALLEL_PDF_MIN_PAGES", 2)
+    monkeypatch.setattr(document_uploader.os, "cpu_count", lambda: 2)
+    pool = document_uploader.get_pdf_process_pool()
+    monkeypatch.setattr(document_uploader, "get_pdf_process_pool", lambda: pool)
+    try:
+        pages = [f"Page {number}" for number in range(1, 5)]
+        assert page_lines(document_uploader._extract_text_with_pdfium(pdf_bytes(*pages))) == pages
+    finally:
+        pool.shutdown()
+
+def test_unreadable_pdf_returns_no_text():
+    assert document_uploader.extract_text_from_pdf(b"not a pdf") == ""
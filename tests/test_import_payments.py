@@ -0,0 +1,81 @@
+import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import utils.import_payments as import_payments
+from models.base import Base
+from models.payment_tracker import Payment
+
+CSV = '''"Date","Employee Name","Role","Game","Crypto Amount (SOL)","FMV (USD)","USD Paid","Method","Status","Notes"
+"02/05/2025","Romeo","Modeler","Anime Stars","4","$600","-","Direct Crypto","Paid","Character models"
+"02/06/2025","Zel","Builder","Piece Quest","-","$1,200","$1,200","Bank","Pending","Main map"
+"02/07/2025","Kai","Animator","Anime Stars","-","-","-","PayPal","Paid","Nothing paid"
+"02/08/2025","Mia","UI Artist","Piece Quest","-","$50","$50","PayPal","Paid","HUD"
+'''
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    """Point the importer at a fresh in-memory SQLite database"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(import_payments, "engine", engine)
+    monkeypatch.setattr(import_payments, "SessionLocal", factory)
+    Base.metadata.create_all(engine)
+    yield factory
+    import_payments.load_payments_csv.cache_clear()
+
+@pytest.fixture
+def payments(session_factory, tmp_path):
+    """Import the fixture CSV and return the stored payments keyed by employee"""
+    csv_path = tmp_path / "payments.csv"
+    csv_path.write_text(CSV)
+    import_payments.import_payments_from_csv(str(csv_path))
+
+    db = session_factory()
+    try:
+        return {payment.employee_id: payment for payment in db.query(Payment).all()}
+    finally:
+        db.close()
+
+def test_sol_row(payments):
+    payment = payments["Romeo"]
+    assert payment.amount == 4.0
+    assert payment.currency == "SOL"
+    assert payment.payment_method == "crypto_sol"
+    assert payment.transaction_id == "imported_Romeo_20250205"
+
+def test_usd_row_strips_dollar_sign_and_commas(payments):
+    payment = payments["Zel"]
+    assert payment.amount == 1200.0
+    assert payment.currency == "USD"
+    assert payment.payment_method == "bank"
+    assert payment.transaction_id == "imported_Zel_20250206"
+
+def test_usd_row_without_bank_is_paypal(payments):
+    payment = payments["Mia"]
+    assert payment.amount == 50.0
+    assert payment.currency == "USD"
+    assert payment.payment_method == "paypal"
+
+def test_row_without_amount_is_skipped(payments):
+    assert "Kai" not in payments
+    assert len(payments) == 3
+
+def test_paid_row_is_completed(payments):
+    payment = payments["Romeo"]
+    assert payment.status == "completed"
+    assert payment.created_at == datetime.datetime(2025, 2, 5)
+    assert payment.completed_at == datetime.datetime(2025, 2, 5)
+
+def test_unpaid_row_is_pending(payments):
+    payment = payments["Zel"]
+    assert payment.status == "pending"
+    assert payment.created_at == datetime.datetime(2025, 2, 6)
+    assert payment.completed_at is None
@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+
+from services.knowledge_base import GameDesignKnowledgeBase
+
+@pytest.fixture
+def knowledge_base(tmp_path, monkeypatch):
+    """A knowledge base in a fresh database file, without embeddings"""
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    return GameDesignKnowledgeBase(db_path=str(tmp_path / "knowledge_base.db"))
+
+def count_rows(knowledge_base, table):
+    conn = sqlite3.connect(knowledge_base.db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+def test_bulk_add_counts_distinct_rows(knowledge_base):
+    count = knowledge_base.add_knowledge_bulk({
+        "game_design_concepts": [
+            {"concept_name": "Core Loop", "description": "first"},
+            {"concept_name": "Meta Game", "description": "outer loop"},
+            {"concept_name": "Core Loop", "description": "second"},
+        ],
+        "market_research": [
+            {"title": "Retention study", "key_findings": "D1"},
+            {"title": "Retention study", "key_findings": "D7"},
+        ],
+    })
+    assert count == 4
+    assert count_rows(knowledge_base, "game_design_concepts") == 2
+    assert count_rows(knowledge_base, "market_research") == 2
+
+def test_bulk_add_keeps_the_last_repeated_entry(knowledge_base):
+    knowledge_base.add_knowledge_bulk({"game_design_concepts": [
+        {"concept_name": "Core Loop", "description": "first"},
+        {"concept_name": "Core Loop", "description": "second"},
+    ]})
+    conn = sqlite3.connect(knowledge_base.db_path)
+    try:
+        descriptions = conn.execute("SELECT description FROM game_design_concepts").fetchall()
+    finally:
+        conn.close()
+    assert descriptions == [("second",)]
+
+def test_bulk_add_updates_existing_entries(knowledge_base):
+    knowledge_base.add_knowledge_bulk({"game_design_concepts": [{"concept_name": "Core Loop", "description": "first"}]})
+    assert knowledge_base.add_knowledge_bulk({"game_design_concepts": [{"concept_name": "Core Loop", "description": "second"}]}) == 1
+    assert count_rows(knowledge_base, "game_design_concepts") == 1
+
+SEED_TABLES = ["game_design_concepts", "industry_practices", "educational_resources", "market_research"]
+
+def test_sample_data_is_added_once(knowledge_base):
+    knowledge_base.initialize_with_sample_data()
+    counts = [count_rows(knowledge_base, table) for table in SEED_TABLES]
+    assert all(counts)
+    
+    knowledge_base.initialize_with_sample_data()
+    assert [count_rows(knowledge_base, table) for table in SEED_TABLES] == counts
+
+def test_sample_data_reinit_restores_changed_rows(knowledge_base):
+    knowledge_base.initialize_with_sample_data()
+    conn = sqlite3.connect(knowledge_base.db_path)
+    try:
+        with conn:
+            conn.execute("UPDATE game_design_concepts SET description = 'stale' WHERE concept_name = 'Core Game Loop'")
+            conn.execute("UPDATE market_research SET key_findings = 'stale'")
+    finally:
+        conn.close()
+    research_rows = count_rows(knowledge_base, "market_research")
+    
+    knowledge_base.initialize_with_sample_data()
+    conn = sqlite3.connect(knowledge_base.db_path)
+    try:
+        stale = conn.execute(
+            "SELECT (SELECT COUNT(*) FROM game_design_concepts WHERE description = 'stale')"
+            " + (SELECT COUNT(*) FROM market_research WHERE key_findings = 'stale')"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    assert stale == 0
+    assert count_rows(knowledge_base, "market_research") == research_rows
@@ -2,6 +2,7 @@ import sys
 import os
 import importlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(
@@ -74,11 +75,9 @@ def main():
     # Test Python version
     logger.info(f"Python version: {sys.version}")
     
-    # Test imports
-    success = True
-    for module in modules_to_test:
-        if not test_import(module):
-            success = False
+    # Test imports concurrently; disjoint imports overlap their disk I/O
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        success = all(list(executor.map(test_import, modules_to_test)))
     
     # Test numpy specifically
     numpy_ok = test_numpy_compatibility()
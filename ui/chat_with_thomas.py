@@ -4,12 +4,112 @@ import json
 import sys
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add parent directory to path (once, since Streamlit re-executes this script on every rerun)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
 
-# Import OpenAI API helper
-from services.ai_assistant import ThomasAIAssistant
+# API URL for data context
+API_BASE_URL = "http://localhost:8002"
+
+# Shared HTTP session so context requests reuse connections (safe to share between threads).
+# The pool is sized for the concurrent context fetches, and a single quick retry covers
+# a dropped keep-alive connection
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=1, backoff_factor=0.1)
+))
+
+@st.cache_resource
+def get_assistant_core():
+    """Assistant resources (configuration, knowledge base) shared by all chat sessions"""
+    # Imported here so the assistant and knowledge base modules only load when the chat is used
+    from services.ai_assistant import AssistantCore
+    return AssistantCore()
+
+def new_assistant():
+    """A per-session assistant (its own conversation history) on the shared core"""
+    from services.ai_assistant import ThomasAIAssistant
+    return ThomasAIAssistant(core=get_assistant_core())
+
+# Context data changes on the order of minutes, so reuse responses across chat turns
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_data(endpoint):
+    """GET an API endpoint, returning the parsed JSON; raises on failure so errors aren't cached"""
+    response = _session.get(f"{API_BASE_URL}/{endpoint}", timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def post_data(endpoint, payload):
+    """POST JSON to an API endpoint, returning the parsed JSON; raises on failure so errors aren't cached"""
+    response = _session.post(f"{API_BASE_URL}/{endpoint}", json=payload, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+def get_data_many(endpoints):
+    """Fetch several endpoints concurrently, returning their data in the same order"""
+    if not endpoints:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+        futures = [executor.submit(fetch_data, endpoint) for endpoint in endpoints]
+    
+    # Report errors from the script thread; Streamlit calls don't work in worker threads
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except requests.HTTPError:
+            # Endpoints that aren't available just leave that context out
+            results.append(None)
+        except Exception as e:
+            st.error(f"Failed to fetch data: {str(e)}")
+            results.append(None)
+    return results
+
+# Number of projects / employees sent to Thomas when the prompt doesn't name any
+CONTEXT_ITEM_LIMIT = 20
+
+def _filter_by_mentions(items, prompt_lower, get_name):
+    """Keep the items whose name appears in the prompt, or None if no item is named"""
+    mentioned = [item for item in items if get_name(item) and str(get_name(item)).lower() in prompt_lower]
+    return mentioned or None
+
+def filter_context_for_prompt(context_data, prompt):
+    """
+    Shrink the context to what the prompt is about, to keep the LLM input small.
+    
+    Projects and employees named in the prompt are kept; if none are named, the most
+    recent projects and the first employees (up to CONTEXT_ITEM_LIMIT) are used instead.
+    Payments and assets are sent as aggregates, so they are passed through unchanged.
+    """
+    prompt_lower = prompt.lower()
+    filtered = dict(context_data)
+    
+    if "projects" in context_data:
+        projects = context_data["projects"]
+        mentioned = _filter_by_mentions(projects, prompt_lower, lambda p: p.get("name"))
+        recent = sorted(projects, key=lambda p: p.get("start_date") or "", reverse=True)
+        filtered["projects"] = mentioned or recent[:CONTEXT_ITEM_LIMIT]
+    
+    if "employees" in context_data:
+        mentioned = _filter_by_mentions(context_data["employees"], prompt_lower, lambda e: e)
+        filtered["employees"] = mentioned or context_data["employees"][:CONTEXT_ITEM_LIMIT]
+        if mentioned and "employee_payments" in context_data:
+            filtered["employee_payments"] = {
+                employee: payments
+                for employee, payments in context_data["employee_payments"].items()
+                if employee in mentioned
+            }
+    
+    return filtered
 
 def main():
     # Remove the set_page_config call from here since it's called in dashboard.py
@@ -24,21 +124,7 @@ def main():
         st.session_state.messages = []
 
     if "assistant" not in st.session_state:
-        st.session_state.assistant = ThomasAIAssistant()
-
-    # API URL for data context
-    API_BASE_URL = "http://localhost:8002"
-
-    # Function to get data from API
-    def get_data(endpoint):
-        try:
-            response = requests.get(f"{API_BASE_URL}/{endpoint}", timeout=5)
-            if response.status_code == 200:
-                return response.json()
-            return None
-        except Exception as e:
-            st.error(f"Failed to fetch data: {str(e)}")
-            return None
+        st.session_state.assistant = new_assistant()
 
     # Display header
     st.title("💬 Chat with Thomas AI")
@@ -98,6 +184,10 @@ def main():
     include_employees = st.sidebar.checkbox("Employee Information", value=True)
     include_assets = st.sidebar.checkbox("Asset Progress", value=True)
 
+    if st.sidebar.button("Refresh Data"):
+        fetch_data.clear()
+        post_data.clear()
+
     if st.sidebar.button("Reset Conversation"):
         st.session_state.messages = []
         st.session_state.assistant.reset_conversation()
@@ -132,39 +222,43 @@ def main():
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        # Gather context data based on sidebar selections
-        context_data = {}
-        
+        # Gather context data based on sidebar selections. The endpoints don't
+        # depend on each other, so they are all fetched at once.
+        context_endpoints = {}
         if include_projects:
-            projects = get_data("projects/")
-            if projects:
-                context_data["projects"] = projects
-        
+            context_endpoints["projects"] = "projects/"
         if include_payments:
-            payments = get_data("payments/")
-            if payments:
-                context_data["payments"] = payments
-        
+            context_endpoints["payments"] = "payments/"
         if include_employees:
-            employees = get_data("payments/employees")
-            if employees:
-                context_data["employees"] = employees
-                
-                # Get more detailed employee payment information
-                employee_payments = {}
-                for employee in employees[:5]:  # Limit to avoid too many requests
-                    emp_payments = get_data(f"payments/employee/{employee}")
-                    if emp_payments:
-                        employee_payments[employee] = emp_payments
-                
-                if employee_payments:
-                    context_data["employee_payments"] = employee_payments
-        
+            context_endpoints["employees"] = "payments/employees"
         if include_assets:
             # This would require an assets endpoint to be implemented
-            assets = get_data("assets/")
-            if assets:
-                context_data["assets"] = assets
+            context_endpoints["assets"] = "assets/"
+        
+        context_results = get_data_many(list(context_endpoints.values()))
+        context_data = {
+            key: data for key, data in zip(context_endpoints, context_results) if data
+        }
+        
+        employees = context_data.get("employees")
+        if employees:
+            # Get more detailed employee payment information in a single batch request
+            detail_employees = employees[:5]  # Limit to keep the prompt small
+            try:
+                detail_payments = post_data("payments/employees/batch", {"ids": detail_employees}) or {}
+            except requests.HTTPError:
+                detail_payments = {}
+            except Exception as e:
+                st.error(f"Failed to fetch data: {str(e)}")
+                detail_payments = {}
+            employee_payments = {
+                employee: emp_payments
+                for employee, emp_payments in detail_payments.items()
+                if emp_payments
+            }
+            
+            if employee_payments:
+                context_data["employee_payments"] = employee_payments
         
         # Get response from Thomas
         with st.chat_message("assistant"):
@@ -172,9 +266,17 @@ def main():
             message_placeholder.markdown("Thomas is thinking...")
             
             if context_data:
-                response = st.session_state.assistant.ask(prompt, include_data=context_data)
+                stream = st.session_state.assistant.ask_stream(
+                    prompt, include_data=filter_context_for_prompt(context_data, prompt)
+                )
             else:
-                response = st.session_state.assistant.ask(prompt)
+                stream = st.session_state.assistant.ask_stream(prompt)
+            
+            # Show the answer as it arrives rather than after the full completion
+            response = ""
+            for piece in stream:
+                response += piece
+                message_placeholder.markdown(response + "▌")
             
             message_placeholder.markdown(response)
         
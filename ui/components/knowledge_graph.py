@@ -1,9 +1,68 @@
 import streamlit as st
 import networkx as nx
+import numpy as np
 import plotly.graph_objects as go
 import random
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+# igraph's layout runs in C; it is optional and only used for large graphs
+try:
+    import igraph as ig
+except ImportError:
+    ig = None
+
+# Above this many nodes a full spring layout is the dominant cost of drawing the graph
+LARGE_GRAPH_NODES = 300
+
+def _layout_positions(G):
+    """
+    Compute 2D node positions for a graph.
+    
+    Small graphs use a seeded spring layout. Large graphs use igraph's
+    Fruchterman-Reingold layout when igraph is installed, otherwise a spring
+    layout with fewer iterations.
+    
+    Args:
+        G: NetworkX graph to lay out
+        
+    Returns:
+        dict: Mapping of node ID to (x, y) position
+    """
+    if G.number_of_nodes() <= LARGE_GRAPH_NODES:
+        return nx.spring_layout(G, seed=42)
+    
+    if ig is None:
+        return nx.spring_layout(G, seed=42, iterations=20)
+    
+    nodes_list = list(G.nodes())
+    node_index = {node: i for i, node in enumerate(nodes_list)}
+    ig_graph = ig.Graph(
+        n=len(nodes_list),
+        edges=[(node_index[u], node_index[v]) for u, v in G.edges()]
+    )
+    # Seeded like the spring layouts above so a graph always gets the same layout;
+    # a private generator leaves the global random module untouched
+    ig.set_random_number_generator(random.Random(42))
+    layout = ig_graph.layout_fruchterman_reingold(niter=200)
+    return dict(zip(nodes_list, layout.coords))
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_layout(node_ids, edge_pairs):
+    """
+    Lay out a graph given only its structure, cached across Streamlit reruns.
+    
+    Args:
+        node_ids: Tuple of node IDs
+        edge_pairs: Tuple of (source, target) pairs
+        
+    Returns:
+        dict: Mapping of node ID to (x, y) position
+    """
+    G = nx.Graph()
+    G.add_nodes_from(node_ids)
+    G.add_edges_from(edge_pairs)
+    return _layout_positions(G)
 
 def knowledge_graph(
     nodes: List[Dict[str, Any]], 
@@ -15,7 +74,8 @@ def knowledge_graph(
     edge_width_field: Optional[str] = None,
     edge_color_field: Optional[str] = None,
     node_hover_data: Optional[List[str]] = None,
-    edge_hover_data: Optional[List[str]] = None
+    edge_hover_data: Optional[List[str]] = None,
+    pos: Optional[Dict[Any, Tuple[float, float]]] = None
 ):
     """
     Create an interactive knowledge graph visualization.
@@ -31,101 +91,107 @@ def knowledge_graph(
         edge_color_field: Optional field name to use for edge color
         node_hover_data: Optional list of field names to show on node hover
         edge_hover_data: Optional list of field names to show on edge hover
+        pos: Optional mapping of node ID to (x, y); computed with a force layout if omitted
     """
-    # Create a network graph
-    G = nx.Graph()
+    # Nothing to lay out or draw (e.g. before data has loaded)
+    if not nodes:
+        st.info("No nodes to display.")
+        return
     
-    # Add nodes
+    # Index attributes by node ID and by (source, target). An edge given in both
+    # directions is merged into one, and edge endpoints missing from `nodes`
+    # still get drawn, as they would in an undirected networkx graph
+    node_attrs = {}
     for node in nodes:
-        node_id = node['id']
-        G.add_node(node_id)
-        for key, value in node.items():
-            G.nodes[node_id][key] = value
+        node_attrs.setdefault(node['id'], {}).update(node)
     
-    # Add edges
+    edge_attrs = {}
     for edge in edges:
         source = edge['source']
         target = edge['target']
-        G.add_edge(source, target)
-        for key, value in edge.items():
-            G[source][target][key] = value
+        key = (target, source) if (target, source) in edge_attrs else (source, target)
+        edge_attrs.setdefault(key, {}).update(edge)
+        node_attrs.setdefault(source, {})
+        node_attrs.setdefault(target, {})
     
-    # Use a spring layout for node positions
-    # This can be replaced with other layout algorithms
-    pos = nx.spring_layout(G, seed=42)
+    if pos is None:
+        # Compute node positions (spring layout, or a faster one for large graphs).
+        # Positions depend only on the graph's structure, so reruns that don't
+        # change it reuse the cached layout
+        pos = _cached_layout(tuple(node_attrs), tuple(edge_attrs))
+    
+    # Gather positions into one array so node and edge coordinates come from
+    # array slicing rather than per-element Python loops
+    nodes_list = list(node_attrs)
+    node_index = {node: i for i, node in enumerate(nodes_list)}
+    pos_arr = np.array([pos[node] for node in nodes_list], dtype=float).reshape(-1, 2)
     
     # Extract node positions
-    node_x = []
-    node_y = []
-    for node in G.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
+    node_x = pos_arr[:, 0]
+    node_y = pos_arr[:, 1]
     
     # Configure node appearance
-    if node_size_field and node_size_field in G.nodes[list(G.nodes())[0]]:
-        node_sizes = [G.nodes[node][node_size_field] * 10 if G.nodes[node][node_size_field] else 10 for node in G.nodes()]
+    # Nodes missing the size/color field fall back per node instead of the
+    # first node deciding for the whole graph
+    if node_size_field:
+        node_sizes = [(attrs.get(node_size_field) or 1) * 10 for attrs in node_attrs.values()]
     else:
-        node_sizes = [10] * len(G.nodes())
+        node_sizes = [10] * len(node_attrs)
     
-    if node_color_field and node_color_field in G.nodes[list(G.nodes())[0]]:
-        node_colors = [G.nodes[node][node_color_field] for node in G.nodes()]
-    else:
-        node_colors = ['#1f77b4'] * len(G.nodes())
+    node_colors = [attrs.get(node_color_field) for attrs in node_attrs.values()] if node_color_field else []
+    if all(color is None for color in node_colors):
+        node_colors = ['#1f77b4'] * len(node_attrs)
     
     # Create hover text for nodes
     node_hover_text = []
-    for node in G.nodes():
-        hover_text = f"ID: {node}<br>"
-        if 'label' in G.nodes[node]:
-            hover_text += f"Label: {G.nodes[node]['label']}<br>"
+    for node, attrs in node_attrs.items():
+        parts = [f"ID: {node}"]
+        if 'label' in attrs:
+            parts.append(f"Label: {attrs['label']}")
         
         if node_hover_data:
-            for field in node_hover_data:
-                if field in G.nodes[node]:
-                    hover_text += f"{field}: {G.nodes[node][field]}<br>"
+            parts.extend(f"{field}: {attrs[field]}" for field in node_hover_data if field in attrs)
         
-        node_hover_text.append(hover_text)
+        node_hover_text.append("<br>".join(parts))
     
-    # Extract edge positions
-    edge_x = []
-    edge_y = []
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
+    # Extract edge positions as (start, end, NaN) triples; the NaN breaks the
+    # line so every edge is drawn as its own segment
+    edge_index = np.array(
+        [(node_index[u], node_index[v]) for u, v in edge_attrs], dtype=int
+    ).reshape(-1, 2)
+    gaps = np.full(len(edge_index), np.nan)
+    edge_x = np.column_stack([pos_arr[edge_index[:, 0], 0], pos_arr[edge_index[:, 1], 0], gaps]).ravel()
+    edge_y = np.column_stack([pos_arr[edge_index[:, 0], 1], pos_arr[edge_index[:, 1], 1], gaps]).ravel()
     
     # Configure edge appearance
     if edge_width_field:
         edge_widths = []
-        for u, v in G.edges():
-            width = G[u][v].get(edge_width_field, 1)
+        for attrs in edge_attrs.values():
+            width = attrs.get(edge_width_field, 1)
             edge_widths.extend([width, width, None])
     else:
         edge_widths = [1] * len(edge_x)
     
     if edge_color_field:
         edge_colors = []
-        for u, v in G.edges():
-            color = G[u][v].get(edge_color_field, '#888')
+        for attrs in edge_attrs.values():
+            color = attrs.get(edge_color_field, '#888')
             edge_colors.extend([color, color, None])
     else:
         edge_colors = ['#888'] * len(edge_x)
     
     # Create hover text for edges
     edge_hover_text = []
-    for u, v in G.edges():
-        hover_text = f"Source: {G.nodes[u].get('label', u)}<br>Target: {G.nodes[v].get('label', v)}<br>"
+    for (u, v), attrs in edge_attrs.items():
+        parts = [f"Source: {node_attrs[u].get('label', u)}", f"Target: {node_attrs[v].get('label', v)}"]
         
-        if 'label' in G[u][v]:
-            hover_text += f"Relationship: {G[u][v]['label']}<br>"
+        if 'label' in attrs:
+            parts.append(f"Relationship: {attrs['label']}")
         
         if edge_hover_data:
-            for field in edge_hover_data:
-                if field in G[u][v]:
-                    hover_text += f"{field}: {G[u][v][field]}<br>"
+            parts.extend(f"{field}: {attrs[field]}" for field in edge_hover_data if field in attrs)
         
+        hover_text = "<br>".join(parts)
         edge_hover_text.extend([hover_text, hover_text, None])
     
     # Create edges trace
@@ -189,8 +255,17 @@ def taxonomy_tree_visualization(
     nodes = []
     edges = []
     
-    def process_node(node, parent_id=None):
+    # Walk the tree with an explicit stack of (node, parent_id) pairs so deep
+    # taxonomies don't hit the recursion limit; children are pushed in reverse
+    # to keep the same depth-first order as a recursive walk
+    stack = [(root_node, None, 0) for root_node in reversed(taxonomy_tree)]
+    depths = {}
+    children = {}
+    while stack:
+        node, parent_id, depth = stack.pop()
         node_id = node['id']
+        depths[node_id] = depth
+        children[node_id] = [child['id'] for child in node.get('children', [])]
         nodes.append({
             'id': node_id,
             'label': node['name'],
@@ -205,12 +280,22 @@ def taxonomy_tree_visualization(
                 'label': 'parent_of'
             })
         
-        for child in node.get('children', []):
-            process_node(child, node_id)
+        stack.extend((child, node_id, depth + 1) for child in reversed(node.get('children', [])))
     
-    # Process all root nodes
-    for root_node in taxonomy_tree:
-        process_node(root_node)
+    # The hierarchy already gives a natural layout, so skip the force simulation:
+    # leaves are spaced evenly in depth-first order, each parent is centred over
+    # its children, and depth runs top to bottom
+    x_positions = {}
+    next_leaf_x = 0
+    for node in nodes:
+        if not children[node['id']]:
+            x_positions[node['id']] = next_leaf_x
+            next_leaf_x += 1
+    for node in reversed(nodes):
+        node_children = children[node['id']]
+        if node_children:
+            x_positions[node['id']] = (x_positions[node_children[0]] + x_positions[node_children[-1]]) / 2
+    pos = {node_id: (x_positions[node_id], -depths[node_id]) for node_id in x_positions}
     
     # Call the general knowledge graph function
     knowledge_graph(
@@ -219,7 +304,8 @@ def taxonomy_tree_visualization(
         title=title,
         height=height,
         node_size_field='level',
-        node_hover_data=['description', 'level']
+        node_hover_data=['description', 'level'],
+        pos=pos
     )
 
 def concept_relationships_visualization(
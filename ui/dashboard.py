@@ -1,80 +1,250 @@
 import streamlit as st
 import requests
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import pyarrow as pa
 import time
-from datetime import datetime
+from pathlib import Path
+import random
 import logging
-import threading
-import json
-import sys
-import os
-
-# Import project detail view
-from ui.project_detail import display_project_detail
-from ui.knowledge_manager import display_knowledge_manager
-from ui.enhanced_knowledge_manager import display_enhanced_knowledge_manager
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("dashboard.log"),
-        logging.StreamHandler()
-    ]
-)
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# psutil (optional) powers the System page's CPU, memory and disk stats
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Page modules (project detail, knowledge managers) and plotly are imported
+# inside the branches that use them, so other pages don't pay for loading them
+
+# Configure logging once per process; Streamlit re-executes this script on every rerun
+# and would otherwise open a new dashboard.log handle each time
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("dashboard.log"),
+            logging.StreamHandler()
+        ]
+    )
 logger = logging.getLogger("streamlit_dashboard")
 
 # Set the base URL for our API
 API_BASE_URL = "http://localhost:8002"
+CSS_PATH = Path(__file__).parent / "static" / "dashboard.css"
+
+# Shared HTTP session so every API call reuses keep-alive connections. The adapter
+# retries connection errors, 429 and 5xx responses for GETs only, with jittered
+# exponential backoff (up to 0.1s, 0.2s, 0.4s) so a flaky API doesn't stall the page for long
+class JitteredRetry(Retry):
+    """Retry policy whose wait is drawn uniformly from [0, exponential backoff], so
+    sessions hitting a struggling API don't all retry in lockstep"""
+    
+    def get_backoff_time(self):
+        return random.uniform(0, super().get_backoff_time())
+
+SESSION = requests.Session()
+SESSION.headers.update({"Accept": "application/json"})
+_api_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=JitteredRetry(
+        total=3,
+        backoff_factor=0.1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False
+    )
+)
+# Mounted for both schemes so pooling still applies if the API moves behind HTTPS
+SESSION.mount("http://", _api_adapter)
+SESSION.mount("https://", _api_adapter)
+
+# API responses are cached for this long (seconds) in Streamlit's data cache,
+# which is shared by every session and survives reruns
+cache_ttl = 60
 
-# Create a cache dict for API responses to improve performance
-response_cache = {}
-cache_ttl = 60  # TTL in seconds
+# Fixed for the life of the process
+CPU_COUNT = psutil.cpu_count(logical=True) if psutil else None
+
+def fetch_api_json(endpoint, timeout=3, base_url=API_BASE_URL):
+    """GET an API endpoint, returning the parsed JSON (raises on failure or a non-200 status)"""
+    start_time = time.time()
+    response = SESSION.get(f"{base_url}/{endpoint}", timeout=timeout)
+    elapsed = time.time() - start_time
+    
+    if response.status_code != 200:
+        raise RuntimeError(f"status {response.status_code}")
+    
+    # Log successful response
+    logger.info(f"API call to {endpoint} successful ({elapsed:.2f}s)")
+    return orjson.loads(response.content)
+
+# Failures raise instead of returning, so they are never cached. Bounded so per-employee
+# endpoints can't grow the cache without limit
+cached_fetch_api_json = st.cache_data(ttl=cache_ttl, show_spinner=False, max_entries=128)(fetch_api_json)
+
+@st.cache_data(ttl=cache_ttl, show_spinner=False)
+def fetch_health(base_url=API_BASE_URL):
+    """Cached /health probe, keyed by API base URL, for the sidebar badges and System page"""
+    return fetch_api_json("health", base_url=base_url)
+
+@st.cache_resource(show_spinner=False)
+def start_cpu_sampling():
+    """Start psutil's CPU usage measurement window, once per process"""
+    psutil.cpu_percent(interval=None)
+    return True
+
+@st.cache_data(ttl=2, show_spinner=False)
+def system_stats():
+    """CPU, memory and disk usage snapshot; cached briefly so quick reruns reuse it"""
+    start_cpu_sampling()
+    return {
+        # CPU usage since the previous sample, without blocking to measure it
+        "cpu": psutil.cpu_percent(interval=None),
+        "memory": psutil.virtual_memory()._asdict(),
+        "disk": psutil.disk_usage('/')._asdict()
+    }
 
 # Function to get data from API with caching
-def api_get(endpoint, default=None, use_cache=True, retries=3, timeout=3):
-    cache_key = endpoint
-    
-    # Return cached response if available and not expired
-    current_time = time.time()
-    if use_cache and cache_key in response_cache:
-        cached_time, cached_data = response_cache[cache_key]
-        if current_time - cached_time < cache_ttl:
-            return cached_data
-    
-    # Make API request with retries
-    for i in range(retries):
-        try:
-            start_time = time.time()
-            response = requests.get(f"{API_BASE_URL}/{endpoint}", timeout=timeout)
-            elapsed = time.time() - start_time
-            
-            if response.status_code == 200:
-                data = response.json()
-                # Cache the successful response
-                if use_cache:
-                    response_cache[cache_key] = (current_time, data)
-                
-                # Log successful response
-                logger.info(f"API call to {endpoint} successful ({elapsed:.2f}s)")
-                return data
-            else:
-                logger.warning(f"API call to {endpoint} failed with status {response.status_code}")
-                # Only retry on 5xx errors
-                if response.status_code < 500:
-                    break
-                time.sleep(0.5)
-        except requests.exceptions.Timeout:
-            logger.warning(f"API call to {endpoint} timed out (attempt {i+1})")
-        except Exception as e:
-            logger.warning(f"API call to {endpoint} failed: {str(e)}")
-            time.sleep(0.5)
-    
-    # Return default if all retries failed
-    return default
+def api_get(endpoint, default=None, use_cache=True, timeout=3):
+    fetch = cached_fetch_api_json if use_cache else fetch_api_json
+    start_time = time.time()
+    try:
+        return fetch(endpoint, timeout=timeout)
+    except Exception as e:
+        # Return default if all retries failed
+        logger.warning(f"API call to {endpoint} failed after {time.time() - start_time:.2f}s: {str(e)}")
+        return default
+
+def api_get_many(endpoints, default=None):
+    """Fetch several endpoints concurrently, returning a dict of endpoint -> data (or default)"""
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        return dict(zip(endpoints, executor.map(lambda endpoint: api_get(endpoint, default), endpoints)))
+
+def time_endpoint(endpoint):
+    """GET an endpoint uncached, returning its status, response time and size for the performance test"""
+    start_time = time.perf_counter()
+    try:
+        response = SESSION.get(f"{API_BASE_URL}/{endpoint}", timeout=5)
+        response_time = time.perf_counter() - start_time
+        status = response.status_code
+        
+        # Get response size
+        size = len(response.content)
+        size_kb = size / 1024
+        
+        return {
+            "endpoint": endpoint,
+            "status": status,
+            "time": response_time,
+            "size": size_kb
+        }
+    except Exception as e:
+        return {
+            "endpoint": endpoint,
+            "status": "Error",
+            "time": time.perf_counter() - start_time,
+            "size": 0,
+            "error": str(e)
+        }
+
+# Fixed conversion rate used for USD-equivalent totals
+SOL_TO_USD = 150
+
+# Payment fields shown on the Team page, with the defaults used when the API omits one
+PaymentRecord = namedtuple(
+    "PaymentRecord", "date amount currency project method",
+    defaults=("N/A", 0, "USD", "N/A", "N/A")
+)
+
+def payment_records(payments):
+    """Parse payment dicts once into PaymentRecord tuples for attribute access"""
+    fields = PaymentRecord._fields
+    return [PaymentRecord(**{field: payment[field] for field in fields if field in payment}) for payment in payments]
+
+def currency_totals(payments):
+    """Total USD and SOL amounts of a list of payments, in a single pass"""
+    total_usd = total_sol = 0.0
+    for payment in payments:
+        currency = payment.get("currency")
+        if currency == "USD":
+            total_usd += payment.get("amount", 0)
+        elif currency == "SOL":
+            total_sol += payment.get("amount", 0)
+    return total_usd, total_sol
+
+def project_ids_by_name(projects):
+    """Map project name to ID, for the project pickers in the create forms"""
+    project_id_by_name = {}
+    for project in projects:
+        # The first project with a given name wins, as with the old lookup loops
+        project_id_by_name.setdefault(project["name"], project["id"])
+    return project_id_by_name
+
+# API dates are ISO strings (YYYY-MM-DD, possibly followed by a time); an explicit format
+# lets pandas use its fast parser instead of inferring the format
+DATE_FORMAT = "%Y-%m-%d"
+
+def date_column(label):
+    """column_config that shows a datetime64 column as a date, formatted in the browser"""
+    return {label: st.column_config.DateColumn(label, format="YYYY-MM-DD")}
+
+# Keyed on the payments payload, so reruns with unchanged data skip building the frame.
+# Each call gets its own copy, so callers may modify the result
+@st.cache_data(ttl=cache_ttl, show_spinner=False)
+def payments_frame(payments, defaults):
+    """DataFrame of the payment fields named in defaults, with missing values filled from it"""
+    return pd.DataFrame.from_records(payments, columns=list(defaults)).fillna(defaults)
+
+@st.cache_data(ttl=cache_ttl, show_spinner=False)
+def payments_table(payments):
+    """All-payments table, newest first"""
+    payment_df = payments_frame(payments, {
+        "date": "N/A", "recipient": "Unknown", "amount": 0, "currency": "USD", "project": "N/A", "method": "N/A"
+    }).rename(columns={
+        "date": "Date", "recipient": "Recipient", "amount": "Amount",
+        "currency": "Currency", "project": "Project", "method": "Method"
+    })
+    
+    # Sort by date
+    payment_df["Date"] = pd.to_datetime(payment_df["Date"], format=DATE_FORMAT, exact=False, cache=True, errors="coerce")
+    payment_df = payment_df.sort_values("Date", ascending=False)
+    return payment_df
+
+@st.cache_data(ttl=cache_ttl, show_spinner=False)
+def assets_table(assets):
+    """All-assets table, soonest due first"""
+    asset_df = pd.DataFrame.from_records(
+        assets, columns=["name", "asset_type", "status", "progress", "assigned_to", "due_date", "project"]
+    ).fillna({
+        "name": "Unnamed", "asset_type": "Unknown", "status": "Unknown", "progress": 0,
+        "assigned_to": "Unassigned", "due_date": "N/A", "project": "Unknown"
+    }).rename(columns={
+        "name": "Name", "asset_type": "Type", "status": "Status", "progress": "Progress",
+        "assigned_to": "Assigned To", "due_date": "Due Date", "project": "Project"
+    })
+    
+    # Sort by due date
+    asset_df["Due Date"] = pd.to_datetime(asset_df["Due Date"], format=DATE_FORMAT, exact=False, cache=True, errors="coerce")
+    asset_df = asset_df.sort_values("Due Date")
+    return asset_df
+
+def payment_totals(payments_df, by, label):
+    """Sum payments per group into USD, SOL and USD-equivalent columns, largest total first"""
+    totals = payments_df.pivot_table(index=by, columns="currency", values="amount", aggfunc="sum", fill_value=0)
+    totals = totals.reindex(columns=["USD", "SOL"], fill_value=0)
+    totals.columns.name = None
+    totals["Total (USD)"] = totals["USD"] + (totals["SOL"] * SOL_TO_USD)
+    return totals.reset_index().rename(columns={by: label}).sort_values("Total (USD)", ascending=False)
+
+# st.rerun replaced st.experimental_rerun in Streamlit 1.27
+rerun = getattr(st, "rerun", None) or st.experimental_rerun
 
 # Configure the page with a modern design
 st.set_page_config(
@@ -84,119 +254,47 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Add custom CSS for a modern look
-st.markdown("""
-<style>
-    .main .block-container {
-        padding-top: 2rem;
-    }
-    h1, h2, h3 {
-        color: #1E3A8A;
-    }
-    .stButton button {
-        background-color: #1E3A8A;
-        color: white;
-        border-radius: 4px;
-        padding: 0.5rem 1rem;
-        border: none;
-    }
-    .stButton button:hover {
-        background-color: #2563EB;
-        border: none;
-    }
-    .css-1aumxhk {
-        background-color: #F1F5F9;
-        border-radius: 10px;
-        padding: 1rem;
-        margin-bottom: 1rem;
-    }
-    .st-bq {
-        border-left-color: #2563EB !important;
-    }
-    .streamlit-expanderHeader {
-        background-color: #F1F5F9;
-        border-radius: 4px;
-    }
-    .stMetric {
-        background-color: #F1F5F9;
-        border-radius: 10px;
-        padding: 1rem;
-    }
-    div.stMetric > div {
-        text-align: center;
-    }
-    div.stMetric label {
-        color: #1E3A8A !important;
-        font-weight: 600 !important;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Initialize session state for page navigation
-if 'page' not in st.session_state:
-    st.session_state.page = 'Dashboard'
+# Add custom CSS for a modern look. Theme colours live in .streamlit/config.toml;
+# the stylesheet only covers what the theme can't express
+@st.cache_resource(show_spinner=False)
+def load_css():
+    """Read the dashboard stylesheet once per process"""
+    return f"<style>\n{CSS_PATH.read_text()}</style>"
 
-# Sidebar navigation
-st.sidebar.title("Navigation")
-page_selections = ["Dashboard", "Projects", "Finance", "Team", "Assets", "Knowledge", "System"]
-selected_page = st.sidebar.radio("Go to", page_selections)
+st.markdown(load_css(), unsafe_allow_html=True)
 
-# Update the page state when a new page is selected
-if selected_page != st.session_state.page:
-    # Reset any page-specific state if needed
-    if selected_page == 'Dashboard':
-        # Reset any dashboard-specific state
-        pass
-    
-    st.session_state.page = selected_page
-    st.experimental_rerun()
+# Define page content functions
+PROJECT_GRID_PAGE_SIZE = 30
 
-# Main content
-st.title("🎮 Thomas AI Management System")
+def project_card_text(project):
+    """Markdown for the body of a project card"""
+    return "\n\n".join([
+        f"### {project.get('name', 'Unnamed Project')}",
+        f"**Budget:** ${project.get('total_budget', 0):,.2f}",
+        f"**Timeline:** {project.get('start_date', 'N/A')} to {project.get('end_date', 'N/A')}",
+    ])
 
-# Display different content based on the current page
-if st.session_state.page == 'Dashboard':
-    display_dashboard()
-elif st.session_state.page == 'Projects':
-    display_projects_page()
-elif st.session_state.page == 'Finance':
-    display_finance_page()
-elif st.session_state.page == 'Team':
-    display_team_page()
-elif st.session_state.page == 'Assets':
-    display_assets_page()
-elif st.session_state.page == 'Knowledge':
-    # Check if we're using the enhanced knowledge manager
-    if "use_enhanced_knowledge_manager" not in st.session_state:
-        st.session_state.use_enhanced_knowledge_manager = True  # Default to new version
-    
-    # Add a toggle to switch between old and new versions
-    use_enhanced = st.sidebar.checkbox("Use Enhanced Knowledge Manager", value=st.session_state.use_enhanced_knowledge_manager)
-    
-    if use_enhanced != st.session_state.use_enhanced_knowledge_manager:
-        st.session_state.use_enhanced_knowledge_manager = use_enhanced
-        st.experimental_rerun()
-    
-    if st.session_state.use_enhanced_knowledge_manager:
-        display_enhanced_knowledge_manager()
-    else:
-        display_knowledge_manager()
-elif st.session_state.page == 'System':
-    display_system_page()
-elif st.session_state.page == 'Project Detail' and 'current_project' in st.session_state:
-    # Go back button
-    if st.button("← Back to Projects"):
-        st.session_state.page = 'Projects'
-        st.experimental_rerun()
-    
-    # Display the project detail
-    display_project_detail(st.session_state.current_project)
-else:
-    # Default to dashboard if the page is not recognized
-    st.session_state.page = 'Dashboard'
-    st.experimental_rerun()
+def render_project_grid(projects, key):
+    """Render projects as a 3-column grid of cards, paginated for long project lists"""
+    if len(projects) > PROJECT_GRID_PAGE_SIZE:
+        page_count = -(-len(projects) // PROJECT_GRID_PAGE_SIZE)
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key=f"{key}_page")
+        start = (page - 1) * PROJECT_GRID_PAGE_SIZE
+        projects = projects[start:start + PROJECT_GRID_PAGE_SIZE]
+    
+    # Format every card up front, then emit one markdown element per card
+    cards = [(project.get('id'), project_card_text(project)) for project in projects]
+    cols = st.columns(3)
+    for i, (project_id, text) in enumerate(cards):
+        with cols[i % 3]:
+            with st.container():
+                st.markdown(text)
+                st.progress(0.6)  # Mock progress - would need real data
+                if st.button("View Details", key=f"view_{project_id}"):
+                    st.session_state.current_project = project_id
+                    st.session_state.page = 'Project Detail'
+                    rerun()
 
-# Define page content functions
 def display_dashboard():
     """Display the main dashboard content"""
     st.subheader("📊 Overview")
@@ -204,53 +302,40 @@ def display_dashboard():
     # Summary metrics at the top
     col1, col2, col3, col4 = st.columns(4)
     
-    # Fetch summary data
-    projects_count = len(api_get("projects/", []))
+    # Fetch summary data; the endpoints are independent, so request them all at once
+    data = api_get_many(["projects/", "payments/", "payments/employees", "assets/"], [])
+    projects = data["projects/"]
+    projects_count = len(projects)
     
     # Project metrics
     with col1:
         st.metric("Active Projects", projects_count)
     
     # Payment metrics
-    payments = api_get("payments/", [])
-        if payments:
-            total_usd = sum(p.get("amount", 0) for p in payments if p.get("currency") == "USD")
+    payments = data["payments/"]
+    if payments:
+        total_usd, _ = currency_totals(payments)
         with col2:
             st.metric("Total Payments", f"${total_usd:,.2f}")
-        else:
+    else:
         with col2:
             st.metric("Total Payments", "$0.00")
     
     # Team metrics
-    employees = api_get("payments/employees", [])
+    employees = data["payments/employees"]
     with col3:
         st.metric("Team Members", len(employees) if employees else 0)
     
     # Asset metrics
-    assets = api_get("assets/", [])
+    assets = data["assets/"]
     with col4:
         st.metric("Assets", len(assets) if assets else 0)
     
     # Active Projects
     st.subheader("Active Projects")
     
-    # Get projects data
-    projects = api_get("projects/", [])
-    
     if projects:
-        # Create a nice grid of project cards
-        cols = st.columns(3)
-        for i, project in enumerate(projects):
-            with cols[i % 3]:
-                with st.container():
-                    st.markdown(f"### {project.get('name', 'Unnamed Project')}")
-                    st.progress(0.6)  # Mock progress - would need real data
-                    st.markdown(f"**Budget:** ${project.get('total_budget', 0):,.2f}")
-                    st.markdown(f"**Timeline:** {project.get('start_date', 'N/A')} to {project.get('end_date', 'N/A')}")
-                    if st.button(f"View Details", key=f"view_{project.get('id')}"):
-                        st.session_state.current_project = project.get('id')
-                        st.session_state.page = 'Project Detail'
-                        st.experimental_rerun()
+        render_project_grid(projects, "dashboard_projects")
     else:
         st.info("No projects found. Create a project to get started.")
     
@@ -258,19 +343,24 @@ def display_dashboard():
     st.subheader("Recent Payments")
     
     if payments:
-        # Create a dataframe for the payments
-        payment_data = []
-        for payment in payments[:5]:  # Show only the 5 most recent payments
-            payment_data.append({
-                "Date": payment.get("date", "N/A"),
-                "Recipient": payment.get("recipient", "Unknown"),
-                "Amount": f"{payment.get('currency', 'USD')} {payment.get('amount', 0):,.2f}",
-                "Project": payment.get("project", "N/A"),
-                "Status": payment.get("status", "Completed")
-            })
+        # Parse and sort the payment dates once; the recent-payments table and the
+        # monthly chart below are both read from this frame
+        payments_by_date = payments_frame(payments, {
+            "date": "", "recipient": "Unknown", "currency": "USD", "amount": 0, "project": "N/A", "status": "Completed"
+        })
+        payments_by_date["date"] = pd.to_datetime(payments_by_date["date"], format=DATE_FORMAT, exact=False, cache=True, errors="coerce")
+        payments_by_date = payments_by_date.sort_values("date", ascending=False)
         
-        payment_df = pd.DataFrame(payment_data)
-        st.table(payment_df)
+        # Create a dataframe for the 5 most recent payments
+        recent_df = payments_by_date.head(5)
+        payment_df = pd.DataFrame({
+            "Date": recent_df["date"],
+            "Recipient": recent_df["recipient"],
+            "Amount": recent_df["currency"] + " " + recent_df["amount"].map("{:,.2f}".format),
+            "Project": recent_df["project"],
+            "Status": recent_df["status"]
+        })
+        st.dataframe(payment_df, use_container_width=True, hide_index=True, column_config=date_column("Date"))
     else:
         st.info("No payment data available.")
     
@@ -278,48 +368,21 @@ def display_dashboard():
     st.subheader("Financial Overview")
     
     if payments:
-        # Group payments by month and project
-        payment_by_month_project = {}
-        for payment in payments:
-            date = payment.get("date", "")
-            if date:
-                month = date[:7]  # Get YYYY-MM
-                project = payment.get("project", "Unknown")
-                amount = payment.get("amount", 0)
-                currency = payment.get("currency", "USD")
-                
-                # Convert to USD for consistency
-                usd_amount = amount
-                if currency == "SOL":
-                    usd_amount = amount * 150  # Assuming 1 SOL = $150 USD
-                
-                if month not in payment_by_month_project:
-                    payment_by_month_project[month] = {}
-                
-                if project not in payment_by_month_project[month]:
-                    payment_by_month_project[month][project] = 0
-                
-                payment_by_month_project[month][project] += usd_amount
-        
-        # Convert to dataframe
-        fin_data = []
-        for month, projects in payment_by_month_project.items():
-            for project, amount in projects.items():
-                fin_data.append({
-                    "Month": month,
-                    "Project": project,
-                    "Amount": amount
-                })
+        # Group payments by month and project, converted to USD for consistency
+        dated_df = payments_by_date.dropna(subset=["date"])
+        fin_df = pd.DataFrame({
+            "Month": dated_df["date"].dt.to_period("M").dt.to_timestamp(),
+            "Project": dated_df["project"],
+            "Amount": dated_df["amount"].where(dated_df["currency"] != "SOL", dated_df["amount"] * SOL_TO_USD)
+        }).groupby(["Month", "Project"], as_index=False)["Amount"].sum()
         
-        if fin_data:
-            fin_df = pd.DataFrame(fin_data)
-            
-            # Sort by month
-            fin_df["Month"] = pd.to_datetime(fin_df["Month"])
-            fin_df = fin_df.sort_values("Month")
+        if not fin_df.empty:
+            # groupby returns the months in order; pass that order on so plotly doesn't re-sort
             fin_df["Month"] = fin_df["Month"].dt.strftime("%b %Y")
+            month_order = fin_df["Month"].unique().tolist()
             
             # Create a stacked bar chart
+            import plotly.express as px
             fig = px.bar(
                 fin_df, 
                 x="Month", 
@@ -327,10 +390,13 @@ def display_dashboard():
                 color="Project",
                 title="Monthly Payments by Project (USD)",
                 labels={"Amount": "Amount (USD)", "Month": ""},
+                category_orders={"Month": month_order},
                 color_discrete_sequence=px.colors.qualitative.Pastel
             )
+            # Keep the user's zoom/pan when the chart is redrawn on a rerun
+            fig.update_layout(uirevision="financial_overview")
             
-            st.plotly_chart(fig)
+            st.plotly_chart(fig, use_container_width=True, theme=None)
         else:
             st.info("Not enough financial data for visualization.")
     else:
@@ -369,43 +435,29 @@ def display_projects_page():
                     
                     # Send to the API
                     try:
-                        response = requests.post(
+                        response = SESSION.post(
                             f"{API_BASE_URL}/projects/",
                             json=new_project
                         )
                         
                         if response.status_code == 200 or response.status_code == 201:
-                            st.success("Project created successfully!")
-                            # Clear cache to show the new project
-                            if "projects/" in response_cache:
-                                del response_cache["projects/"]
-                            # Refresh the page
-                            time.sleep(1)
-                            st.experimental_rerun()
-                            else:
+                            # Clear cache to show the new project, then refresh the page; the
+                            # success message is shown after the rerun
+                            cached_fetch_api_json.clear()
+                            st.session_state.flash_message = "Project created successfully!"
+                            rerun()
+                        else:
                             st.error(f"Failed to create project: {response.text}")
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
-            else:
+                else:
                     st.warning("Project name is required")
     
     # List all projects
     projects = api_get("projects/", [])
     
     if projects:
-        # Create a nice grid of project cards
-        cols = st.columns(3)
-        for i, project in enumerate(projects):
-            with cols[i % 3]:
-                with st.container():
-                    st.markdown(f"### {project.get('name', 'Unnamed Project')}")
-                    st.progress(0.6)  # Mock progress - would need real data
-                    st.markdown(f"**Budget:** ${project.get('total_budget', 0):,.2f}")
-                    st.markdown(f"**Timeline:** {project.get('start_date', 'N/A')} to {project.get('end_date', 'N/A')}")
-                    if st.button(f"View Details", key=f"view_{project.get('id')}"):
-                        st.session_state.current_project = project.get('id')
-                        st.session_state.page = 'Project Detail'
-                        st.experimental_rerun()
+        render_project_grid(projects, "projects_page")
     else:
         st.info("No projects found. Create a project to get started.")
     
@@ -416,8 +468,8 @@ def display_finance_page():
     # Add new payment form
     with st.expander("Add New Payment"):
         with st.form("new_payment_form"):
-            projects = api_get("projects/", [])
-            project_names = ["None"] + [p["name"] for p in projects]
+            project_id_by_name = project_ids_by_name(api_get("projects/", []))
+            project_names = ["None"] + list(project_id_by_name)
             selected_project = st.selectbox("Project", project_names)
             
             recipient = st.text_input("Recipient")
@@ -432,12 +484,7 @@ def display_finance_page():
             if submit_button:
                 if recipient and amount > 0:
                     # Get project ID if a project was selected
-                    project_id = None
-                    if selected_project != "None":
-                        for p in projects:
-                            if p["name"] == selected_project:
-                                project_id = p["id"]
-                                break
+                    project_id = project_id_by_name.get(selected_project)
                     
                     # Format the data for the API
                     new_payment = {
@@ -451,19 +498,17 @@ def display_finance_page():
                     
                     # Send to the API
                     try:
-                        response = requests.post(
+                        response = SESSION.post(
                             f"{API_BASE_URL}/payments/",
                             json=new_payment
                         )
                         
                         if response.status_code == 200 or response.status_code == 201:
-                            st.success("Payment recorded successfully!")
-                            # Clear cache to show the new payment
-                            if "payments/" in response_cache:
-                                del response_cache["payments/"]
-                            # Refresh the page
-                            time.sleep(1)
-                            st.experimental_rerun()
+                            # Clear cache to show the new payment, then refresh the page; the
+                            # success message is shown after the rerun
+                            cached_fetch_api_json.clear()
+                            st.session_state.flash_message = "Payment recorded successfully!"
+                            rerun()
                         else:
                             st.error(f"Failed to record payment: {response.text}")
                     except Exception as e:
@@ -475,66 +520,31 @@ def display_finance_page():
     payments = api_get("payments/", [])
     
     if payments:
+        # One frame for all the grouped views; missing fields get the same defaults as before
+        payments_df = payments_frame(payments, {"project": "Unknown", "recipient": "Unknown", "amount": 0, "currency": "USD"})
+        
         # Create tabs for different views
         tab1, tab2, tab3 = st.tabs(["All Payments", "By Project", "By Recipient"])
         
         with tab1:
             # Create a dataframe for the payments
-            payment_data = []
-            for payment in payments:
-                payment_data.append({
-                    "Date": payment.get("date", "N/A"),
-                    "Recipient": payment.get("recipient", "Unknown"),
-                    "Amount": payment.get("amount", 0),
-                    "Currency": payment.get("currency", "USD"),
-                    "Project": payment.get("project", "N/A"),
-                    "Method": payment.get("method", "N/A")
-                })
+            payment_df = payments_table(payments)
             
-            if payment_data:
-                payment_df = pd.DataFrame(payment_data)
-                
-                # Sort by date
-                payment_df["Date"] = pd.to_datetime(payment_df["Date"])
-                payment_df = payment_df.sort_values("Date", ascending=False)
-                payment_df["Date"] = payment_df["Date"].dt.strftime("%Y-%m-%d")
-                
+            if not payment_df.empty:
                 # Display as a table
-                st.dataframe(payment_df)
+                st.dataframe(payment_df, use_container_width=True, hide_index=True, column_config=date_column("Date"))
             else:
                 st.info("No payment data available.")
         
         with tab2:
-            # Group payments by project
-            payment_by_project = {}
-            for payment in payments:
-                project = payment.get("project", "Unknown")
-                amount = payment.get("amount", 0)
-                currency = payment.get("currency", "USD")
-                
-                if project not in payment_by_project:
-                    payment_by_project[project] = {"USD": 0, "SOL": 0}
-                
-                payment_by_project[project][currency] += amount
-            
-            # Create a dataframe
-            project_data = []
-            for project, amounts in payment_by_project.items():
-                project_data.append({
-                    "Project": project,
-                    "USD": amounts["USD"],
-                    "SOL": amounts["SOL"],
-                    "Total (USD)": amounts["USD"] + (amounts["SOL"] * 150)  # Assuming 1 SOL = $150 USD
-                })
-            
-            if project_data:
-                project_df = pd.DataFrame(project_data)
-                project_df = project_df.sort_values("Total (USD)", ascending=False)
-                
+            project_df = payment_totals(payments_df, "project", "Project")
+            
+            if not project_df.empty:
                 # Display as a table
-                st.dataframe(project_df)
+                st.dataframe(project_df, use_container_width=True, hide_index=True)
                 
                 # Create a pie chart of payment distribution
+                import plotly.express as px
                 fig = px.pie(
                     project_df, 
                     values="Total (USD)",
@@ -542,51 +552,23 @@ def display_finance_page():
                     title="Payment Distribution by Project",
                     color_discrete_sequence=px.colors.qualitative.Pastel
                 )
+                fig.update_layout(uirevision="project_distribution")
                 
-                st.plotly_chart(fig)
+                st.plotly_chart(fig, use_container_width=True, theme=None)
             else:
                 st.info("No payment data available.")
         
         with tab3:
-            # Group payments by recipient
-            payment_by_recipient = {}
-            for payment in payments:
-                recipient = payment.get("recipient", "Unknown")
-                amount = payment.get("amount", 0)
-                currency = payment.get("currency", "USD")
-                
-                if recipient not in payment_by_recipient:
-                    payment_by_recipient[recipient] = {"USD": 0, "SOL": 0}
-                
-                payment_by_recipient[recipient][currency] += amount
-            
-            # Create a dataframe
-            recipient_data = []
-            for recipient, amounts in payment_by_recipient.items():
-                recipient_data.append({
-                    "Recipient": recipient,
-                    "USD": amounts["USD"],
-                    "SOL": amounts["SOL"],
-                    "Total (USD)": amounts["USD"] + (amounts["SOL"] * 150)  # Assuming 1 SOL = $150 USD
-                })
-            
-            if recipient_data:
-                recipient_df = pd.DataFrame(recipient_data)
-                recipient_df = recipient_df.sort_values("Total (USD)", ascending=False)
-                
+            recipient_df = payment_totals(payments_df, "recipient", "Recipient")
+            
+            if not recipient_df.empty:
                 # Display as a table
-                st.dataframe(recipient_df)
+                st.dataframe(recipient_df, use_container_width=True, hide_index=True)
                 
                 # Create a bar chart of payment distribution
-                fig = px.bar(
-                    recipient_df, 
-                    x="Recipient",
-                    y="Total (USD)",
-                    title="Total Payments by Recipient",
-                    color_discrete_sequence=px.colors.qualitative.Pastel
-                )
-                
-                st.plotly_chart(fig)
+                # Single-series chart: Streamlit's native chart avoids building a Plotly figure
+                st.caption("Total Payments by Recipient")
+                st.bar_chart(recipient_df.set_index("Recipient")["Total (USD)"])
             else:
                 st.info("No payment data available.")
     else:
@@ -596,10 +578,20 @@ def display_team_page():
     """Display the team page content"""
     st.subheader("👥 Team")
     
-    # List all team members (derived from payment recipients)
-    employees = api_get("payments/employees", [])
+    # List all team members (derived from payment recipients) along with all payments
+    data = api_get_many(["payments/employees", "payments/"], [])
+    employees = data["payments/employees"]
     
     if employees:
+        # Group the payments by member client-side (one request instead of one per
+        # member) and parse them once; both tabs read from these
+        payments_by_employee = {employee: [] for employee in employees}
+        for payment in data["payments/"]:
+            employee_payments = payments_by_employee.get(payment.get("employee_id"))
+            if employee_payments is not None:
+                employee_payments.append(payment)
+        records_by_employee = {employee: payment_records(payments) for employee, payments in payments_by_employee.items()}
+        
         # Create tabs for different views
         tab1, tab2 = st.tabs(["Team Members", "Payment History"])
         
@@ -613,41 +605,31 @@ def display_team_page():
                         st.markdown("**Role:** Developer")  # This would come from a real data source
                         
                         # Get payments for this employee
-                        employee_payments = api_get(f"payments/employee/{employee}", [])
+                        employee_payments = payments_by_employee[employee]
                         
                         if employee_payments:
-                            total_usd = sum(p.get("amount", 0) for p in employee_payments if p.get("currency") == "USD")
-                            total_sol = sum(p.get("amount", 0) for p in employee_payments if p.get("currency") == "SOL")
+                            total_usd, total_sol = currency_totals(employee_payments)
                             
                             st.markdown(f"**Total Paid:** ${total_usd:,.2f} USD, {total_sol:,.2f} SOL")
-                            st.markdown(f"**Last Payment:** {employee_payments[0].get('date', 'N/A')}")
+                            st.markdown(f"**Last Payment:** {records_by_employee[employee][0].date}")
         
         with tab2:
             # Display payment history for all team members
-            payment_data = []
-            for employee in employees:
-                employee_payments = api_get(f"payments/employee/{employee}", [])
-                
-                for payment in employee_payments:
-                    payment_data.append({
-                        "Date": payment.get("date", "N/A"),
-                        "Recipient": employee,
-                        "Amount": payment.get("amount", 0),
-                        "Currency": payment.get("currency", "USD"),
-                        "Project": payment.get("project", "N/A"),
-                        "Method": payment.get("method", "N/A")
-                    })
+            payment_data = [
+                (record.date, employee, record.amount, record.currency, record.project, record.method)
+                for employee, records in records_by_employee.items()
+                for record in records
+            ]
             
             if payment_data:
-                payment_df = pd.DataFrame(payment_data)
+                payment_df = pd.DataFrame(payment_data, columns=["Date", "Recipient", "Amount", "Currency", "Project", "Method"])
                 
                 # Sort by date
-                payment_df["Date"] = pd.to_datetime(payment_df["Date"])
+                payment_df["Date"] = pd.to_datetime(payment_df["Date"], format=DATE_FORMAT, exact=False, cache=True, errors="coerce")
                 payment_df = payment_df.sort_values("Date", ascending=False)
-                payment_df["Date"] = payment_df["Date"].dt.strftime("%Y-%m-%d")
                 
                 # Display as a table
-                st.dataframe(payment_df)
+                st.dataframe(payment_df, use_container_width=True, hide_index=True, column_config=date_column("Date"))
             else:
                 st.info("No payment data available.")
     else:
@@ -657,11 +639,17 @@ def display_assets_page():
     """Display the assets page content"""
     st.subheader("🎨 Assets")
     
+    # Everything the page needs, fetched once and concurrently up front
+    data = api_get_many(["projects/", "payments/employees", "assets/"], [])
+    projects = data["projects/"]
+    employees = data["payments/employees"]
+    assets = data["assets/"]
+    
     # Add new asset form
     with st.expander("Add New Asset"):
         with st.form("new_asset_form"):
-            projects = api_get("projects/", [])
-            project_names = [p["name"] for p in projects] if projects else ["None"]
+            project_id_by_name = project_ids_by_name(projects)
+            project_names = list(project_id_by_name) or ["None"]
             selected_project = st.selectbox("Project", project_names)
             
             asset_name = st.text_input("Asset Name")
@@ -669,7 +657,6 @@ def display_assets_page():
             status = st.selectbox("Status", ["Not Started", "In Progress", "Review", "Completed"])
             progress = st.slider("Progress", 0, 100, 0)
             
-            employees = api_get("payments/employees", [])
             assigned_to = st.selectbox("Assigned To", ["Unassigned"] + employees if employees else ["Unassigned"])
             
             due_date = st.date_input("Due Date")
@@ -679,11 +666,7 @@ def display_assets_page():
             if submit_button:
                 if asset_name and selected_project != "None":
                     # Get project ID
-                    project_id = None
-                    for p in projects:
-                        if p["name"] == selected_project:
-                            project_id = p["id"]
-                            break
+                    project_id = project_id_by_name.get(selected_project)
                     
                     # Format the data for the API
                     new_asset = {
@@ -698,57 +681,36 @@ def display_assets_page():
                     
                     # Send to the API
                     try:
-                        response = requests.post(
+                        response = SESSION.post(
                             f"{API_BASE_URL}/assets/",
                             json=new_asset
                         )
                         
                         if response.status_code == 200 or response.status_code == 201:
-                            st.success("Asset added successfully!")
-                            # Clear cache to show the new asset
-                            if "assets/" in response_cache:
-                                del response_cache["assets/"]
-                            # Refresh the page
-                            time.sleep(1)
-                            st.experimental_rerun()
-                    else:
+                            # Clear cache to show the new asset, then refresh the page; the
+                            # success message is shown after the rerun
+                            cached_fetch_api_json.clear()
+                            st.session_state.flash_message = "Asset added successfully!"
+                            rerun()
+                        else:
                             st.error(f"Failed to add asset: {response.text}")
-                except Exception as e:
+                    except Exception as e:
                         st.error(f"Error: {str(e)}")
                 else:
                     st.warning("Asset name and project are required")
     
     # List all assets
-    assets = api_get("assets/", [])
-    
     if assets:
         # Create tabs for different views
         tab1, tab2, tab3 = st.tabs(["All Assets", "By Project", "By Status"])
         
         with tab1:
             # Create a dataframe for the assets
-            asset_data = []
-            for asset in assets:
-                asset_data.append({
-                    "Name": asset.get("name", "Unnamed"),
-                    "Type": asset.get("asset_type", "Unknown"),
-                    "Status": asset.get("status", "Unknown"),
-                    "Progress": asset.get("progress", 0),
-                    "Assigned To": asset.get("assigned_to", "Unassigned"),
-                    "Due Date": asset.get("due_date", "N/A"),
-                    "Project": asset.get("project", "Unknown")
-                })
-            
-            if asset_data:
-                asset_df = pd.DataFrame(asset_data)
-                
-                # Sort by due date
-                asset_df["Due Date"] = pd.to_datetime(asset_df["Due Date"])
-                asset_df = asset_df.sort_values("Due Date")
-                asset_df["Due Date"] = asset_df["Due Date"].dt.strftime("%Y-%m-%d")
-                
+            asset_df = assets_table(assets)
+            
+            if not asset_df.empty:
                 # Display as a table
-                st.dataframe(asset_df)
+                st.dataframe(asset_df, use_container_width=True, hide_index=True, column_config=date_column("Due Date"))
             else:
                 st.info("No asset data available.")
         
@@ -777,42 +739,22 @@ def display_assets_page():
                             st.progress(asset.get('progress', 0) / 100)
         
         with tab3:
-            # Group assets by status
-            asset_by_status = {}
-            for asset in assets:
-                status = asset.get("status", "Unknown")
-                
-                if status not in asset_by_status:
-                    asset_by_status[status] = []
-                
-                asset_by_status[status].append(asset)
-            
-            # Create a visualization of assets by status
-            status_counts = {status: len(assets) for status, assets in asset_by_status.items()}
+            # Group assets by status, in order of first appearance
+            statuses = pd.DataFrame.from_records(assets, columns=["status"])["status"].fillna("Unknown")
+            by_status = statuses.groupby(statuses, sort=False)
             
             # Create a bar chart
-            status_df = pd.DataFrame({
-                "Status": list(status_counts.keys()),
-                "Count": list(status_counts.values())
-            })
-            
-            fig = px.bar(
-                status_df, 
-                x="Status",
-                y="Count",
-                title="Assets by Status",
-                color="Status",
-                color_discrete_sequence=px.colors.qualitative.Bold
-            )
+            status_counts = by_status.size().rename_axis("Status").rename("Count")
             
-            st.plotly_chart(fig)
+            st.caption("Assets by Status")
+            st.bar_chart(status_counts)
             
             # Create tabs for each status
-            status_tabs = st.tabs(list(asset_by_status.keys()))
+            status_tabs = st.tabs(status_counts.index.tolist())
             
-            for i, (status, status_assets) in enumerate(asset_by_status.items()):
-                with status_tabs[i]:
-                    for asset in status_assets:
+            for status_tab, (status, group) in zip(status_tabs, by_status):
+                with status_tab:
+                    for asset in (assets[i] for i in group.index):
                         with st.expander(f"{asset.get('name', 'Unnamed Asset')} - {asset.get('project', 'Unknown')}"):
                             st.write(f"**Type:** {asset.get('asset_type', 'Unknown')}")
                             st.write(f"**Assigned to:** {asset.get('assigned_to', 'Unassigned')}")
@@ -831,48 +773,55 @@ def display_system_page():
     with col1:
         st.subheader("API Status")
         
+        # The health check is cached for cache_ttl seconds; Refresh forces a new probe
+        if st.button("Refresh", key="refresh_health"):
+            fetch_health.clear()
+        
         # Check API health
         try:
-            health_response = requests.get(f"{API_BASE_URL}/health", timeout=3)
+            health_data = fetch_health()
             
-            if health_response.status_code == 200:
-                health_data = health_response.json()
-                
-                st.success("✅ API Service is running normally")
-                
-                # Display API health information
-                st.json(health_data)
-        else:
-                st.error(f"❌ API Service is not responding properly (Status: {health_response.status_code})")
-    except Exception as e:
-        st.error(f"❌ Could not connect to API Server: {str(e)}")
+            st.success("✅ API Service is running normally")
+            
+            # Display API health information
+            st.json(health_data)
+        except RuntimeError as e:
+            # fetch_api_json raises RuntimeError for non-200 responses
+            st.error(f"❌ API Service is not responding properly ({str(e)})")
+        except Exception as e:
+            st.error(f"❌ Could not connect to API Server: {str(e)}")
     
     with col2:
         st.subheader("System Information")
         
         # Try to get system stats
-        try:
-            import psutil
-            
+        stats = None
+        if psutil is None:
+            st.warning("Could not retrieve system statistics. The psutil module is not installed.")
+        else:
+            try:
+                stats = system_stats()
+            except (psutil.Error, OSError) as e:
+                st.warning(f"Could not retrieve system statistics: {str(e)}")
+        
+        if stats:
             # Get CPU usage
-            cpu_percent = psutil.cpu_percent(interval=0.5)
-            st.metric("CPU Usage", f"{cpu_percent}%")
+            cpu_percent = stats["cpu"]
+            st.metric("CPU Usage", f"{cpu_percent}%", help=f"Across {CPU_COUNT} logical CPUs")
             
             # Get memory usage
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            memory_used = memory.used / (1024 * 1024 * 1024)  # Convert to GB
-            memory_total = memory.total / (1024 * 1024 * 1024)  # Convert to GB
+            memory = stats["memory"]
+            memory_percent = memory["percent"]
+            memory_used = memory["used"] / (1024 * 1024 * 1024)  # Convert to GB
+            memory_total = memory["total"] / (1024 * 1024 * 1024)  # Convert to GB
             st.metric("Memory Usage", f"{memory_percent}% ({memory_used:.2f} GB / {memory_total:.2f} GB)")
             
             # Get disk usage
-            disk = psutil.disk_usage('/')
-            disk_percent = disk.percent
-            disk_used = disk.used / (1024 * 1024 * 1024)  # Convert to GB
-            disk_total = disk.total / (1024 * 1024 * 1024)  # Convert to GB
+            disk = stats["disk"]
+            disk_percent = disk["percent"]
+            disk_used = disk["used"] / (1024 * 1024 * 1024)  # Convert to GB
+            disk_total = disk["total"] / (1024 * 1024 * 1024)  # Convert to GB
             st.metric("Disk Usage", f"{disk_percent}% ({disk_used:.2f} GB / {disk_total:.2f} GB)")
-        except:
-            st.warning("Could not retrieve system statistics. The psutil module may not be installed.")
     
     # Performance Tests
     st.subheader("Performance Tests")
@@ -885,43 +834,25 @@ def display_system_page():
                 "payments/"
             ]
             
+            # Results are shown as each probe finishes, rather than after the slowest one
+            table = st.empty()
+            caption = st.empty()
+            chart = st.empty()
+            
+            # Time all endpoints at once; each result records its own response time
             results = []
-            for endpoint in endpoints:
-                start_time = time.time()
-                try:
-                    response = requests.get(f"{API_BASE_URL}/{endpoint}", timeout=5)
-                    response_time = time.time() - start_time
-                    status = response.status_code
+            with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+                futures = [executor.submit(time_endpoint, endpoint) for endpoint in endpoints]
+                for future in as_completed(futures):
+                    results.append(future.result())
                     
-                    # Get response size
-                    size = len(response.content)
-                    size_kb = size / 1024
+                    # Display results in a DataFrame
+                    df = pd.DataFrame(results)
+                    table.dataframe(df, use_container_width=True, hide_index=True)
                     
-                    results.append({
-                        "endpoint": endpoint,
-                        "status": status,
-                        "time": response_time,
-                        "size": size_kb
-                    })
-    except Exception as e:
-                    results.append({
-                        "endpoint": endpoint,
-                        "status": "Error",
-                        "time": time.time() - start_time,
-                        "size": 0,
-                        "error": str(e)
-                    })
-            
-            # Display results in a DataFrame
-            df = pd.DataFrame(results)
-            st.write(df)
-            
-            # Plot response times
-            if not df.empty:
-                fig = px.bar(df, x="endpoint", y="time", 
-                           title="API Response Times (seconds)",
-                           labels={"endpoint": "Endpoint", "time": "Response Time (s)"})
-                st.plotly_chart(fig)
+                    # Plot response times
+                    caption.caption("API Response Times (seconds)")
+                    chart.bar_chart(df.set_index("endpoint")["time"])
     
     # Database Information
     st.subheader("Database Tables")
@@ -934,19 +865,96 @@ def display_system_page():
                 with st.expander(f"Table: {table['name']}"):
                     st.write(f"Row count: {table.get('row_count', 'Unknown')}")
                     if 'columns' in table:
-                        st.dataframe(pd.DataFrame(table['columns']))
+                        # Straight to Arrow, which st.dataframe sends as is, skipping pandas
+                        st.dataframe(pa.Table.from_pylist(table['columns']), use_container_width=True)
         else:
             st.info("Database schema information not available")
     except:
         st.warning("Could not retrieve database schema information")
 
+# Initialize session state for page navigation
+if 'page' not in st.session_state:
+    st.session_state.page = 'Dashboard'
+
+# Sidebar navigation
+st.sidebar.title("Navigation")
+page_selections = ["Dashboard", "Projects", "Finance", "Team", "Assets", "Knowledge", "System"]
+selected_page = st.sidebar.radio("Go to", page_selections)
+
+# Update the page state when a new page is selected
+if selected_page != st.session_state.page:
+    # Reset any page-specific state if needed
+    if selected_page == 'Dashboard':
+        # Reset any dashboard-specific state
+        pass
+    
+    st.session_state.page = selected_page
+    rerun()
+
+# Main content
+st.title("🎮 Thomas AI Management System")
+
+# Confirmation left by a form before it triggered a rerun
+if "flash_message" in st.session_state:
+    st.success(st.session_state.pop("flash_message"))
+
+# Display different content based on the current page
+if st.session_state.page == 'Dashboard':
+    display_dashboard()
+elif st.session_state.page == 'Projects':
+    display_projects_page()
+elif st.session_state.page == 'Finance':
+    display_finance_page()
+elif st.session_state.page == 'Team':
+    display_team_page()
+elif st.session_state.page == 'Assets':
+    display_assets_page()
+elif st.session_state.page == 'Knowledge':
+    # Check if we're using the enhanced knowledge manager
+    if "use_enhanced_knowledge_manager" not in st.session_state:
+        st.session_state.use_enhanced_knowledge_manager = True  # Default to new version
+    
+    # Add a toggle to switch between old and new versions
+    use_enhanced = st.sidebar.checkbox("Use Enhanced Knowledge Manager", value=st.session_state.use_enhanced_knowledge_manager)
+    
+    if use_enhanced != st.session_state.use_enhanced_knowledge_manager:
+        st.session_state.use_enhanced_knowledge_manager = use_enhanced
+        rerun()
+    
+    if st.session_state.use_enhanced_knowledge_manager:
+        from ui.enhanced_knowledge_manager import display_enhanced_knowledge_manager
+        display_enhanced_knowledge_manager()
+    else:
+        from ui.knowledge_manager import display_knowledge_manager
+        display_knowledge_manager()
+elif st.session_state.page == 'System':
+    display_system_page()
+elif st.session_state.page == 'Project Detail' and 'current_project' in st.session_state:
+    # Go back button
+    if st.button("← Back to Projects"):
+        st.session_state.page = 'Projects'
+        rerun()
+    
+    # Display the project detail
+    from ui.project_detail import display_project_detail
+    display_project_detail(st.session_state.current_project)
+else:
+    # Default to dashboard if the page is not recognized
+    st.session_state.page = 'Dashboard'
+    rerun()
+
 # Modern footer with useful links and information
 st.sidebar.markdown("---")
 st.sidebar.subheader("System Information")
+# The health endpoint reports the database status too, so one (cached) call covers both badges
+try:
+    health = fetch_health()
+except Exception:
+    health = {}
 st.sidebar.info(f"""
 **Thomas AI Management System v1.0**
-- API Status: {'Online ✅' if api_get('', None) is not None else 'Offline ❌'}
-- Database: {'Connected ✅' if api_get('projects/', None) is not None else 'Disconnected ❌'}
+- API Status: {'Online ✅' if health else 'Offline ❌'}
+- Database: {'Connected ✅' if health.get('database') == 'connected' else 'Disconnected ❌'}
 """)
 
 # Help information
@@ -1,14 +1,65 @@
 import streamlit as st
+import io
+import sqlite3
+from zipfile import BadZipFile
 import os
-import tempfile
+import hashlib
+import threading
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import logging
 import pandas as pd
 import PyPDF2
+from PyPDF2.errors import PyPdfError
 import docx
+from docx.opc.exceptions import PackageNotFoundError
+from lxml.etree import XMLSyntaxError
 import json
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from services.knowledge_base import GameDesignKnowledgeBase
 
+# pypdfium2 (optional) extracts PDF text much faster than PyPDF2's pure-Python parser
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# Reused across analyses so repeat calls skip the TLS handshake with the OpenAI API
+OPENAI_SESSION = requests.Session()
+OPENAI_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
+# Model used to analyze documents; part of the analysis cache key
+ANALYSIS_MODEL = "gpt-4"
+
+# Analyses of identical text are reused for this long (seconds), keeping at most this many
+ANALYSIS_CACHE_TTL = 3600
+ANALYSIS_CACHE_SIZE = 32
+
+# (text hash, document type, model) -> (time stored, extracted knowledge); shared by all sessions
+_analysis_cache = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+# Long documents are analyzed in chunks of this many characters, overlapping so items
+# on a boundary are seen whole; at most MAX_CONCURRENT_ANALYSES requests run at once
+ANALYSIS_CHUNK_SIZE = 10000
+ANALYSIS_CHUNK_OVERLAP = 1000
+MAX_ANALYSIS_CHUNKS = 10
+MAX_CONCURRENT_ANALYSES = 4
+
+# Seconds between redraws of the streamed analysis preview
+STREAM_PREVIEW_INTERVAL = 0.25
+
+# PDFs are split across worker processes in chunks of at least this many pages
+PARALLEL_PDF_MIN_PAGES = 50
+
+# pdfium is not thread-safe; short PDFs are read in-process, one script thread at a time
+_pdfium_lock = threading.Lock()
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,42 +67,102 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def extract_text_from_pdf(file_path):
-    """Extract text from a PDF file."""
-    text = ""
+@st.cache_resource(show_spinner=False)
+def get_knowledge_base():
+    """Knowledge base handle shared by every session; creating one checks the schema on disk."""
+    return GameDesignKnowledgeBase()
+
+# Search results are reused for this long (seconds); saving knowledge clears them
+SEARCH_CACHE_TTL = 60
+
+@st.cache_data(ttl=SEARCH_CACHE_TTL, show_spinner=False)
+def search_knowledge(_knowledge_base, query, category):
+    """Search the knowledge base, caching results per (query, category); the handle isn't hashed."""
+    return _knowledge_base.search_knowledge_base(query, category)
+
+def extract_text_from_pdf(file_bytes):
+    """Extract text from the contents of a PDF file, using pdfium when it is installed."""
+    if pdfium is not None:
+        try:
+            return _extract_text_with_pdfium(file_bytes)
+        except (pdfium.PdfiumError, OSError, BrokenProcessPool) as e:
+            if isinstance(e, BrokenProcessPool):
+                # A dead worker breaks the whole pool; start a fresh one next time
+                get_pdf_process_pool.clear()
+            logger.warning(f"pdfium could not read PDF, falling back to PyPDF2: {str(e)}")
+    
     try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting text from PDF: {str(e)}")
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
+        return "".join((page.extract_text() or "") + "\n" for page in pdf_reader.pages)
+    except (PyPdfError, OSError, ValueError, KeyError):
+        logger.exception("Error extracting text from PDF")
         return ""
 
-def extract_text_from_docx(file_path):
-    """Extract text from a DOCX file."""
-    text = ""
+@st.cache_resource(show_spinner=False)
+def get_pdf_process_pool():
+    """Worker processes for long PDFs, shared by every session. They are spawned, not
+    forked, because forking Streamlit's multi-threaded server can deadlock."""
+    return ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+
+def _extract_text_with_pdfium(file_bytes):
+    """Extract text from a PDF file's contents with pypdfium2, splitting long documents across processes."""
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(file_bytes)
+        page_count = len(pdf)
+        pdf.close()
+    
+    workers = min(os.cpu_count() or 1, -(-page_count // PARALLEL_PDF_MIN_PAGES))
+    if workers < 2:
+        with _pdfium_lock:
+            return _extract_pdfium_page_range(file_bytes, 0, page_count)
+    
+    # pdfium is not thread-safe, so each worker process is sent the document's bytes,
+    # opens its own copy and extracts one contiguous range of pages, keeping page order
+    bounds = [page_count * i // workers for i in range(workers + 1)]
+    executor = get_pdf_process_pool()
+    return "".join(executor.map(_extract_pdfium_page_range, [file_bytes] * workers, bounds[:-1], bounds[1:]))
+
+def _extract_pdfium_page_range(file_bytes, start, stop):
+    """Extract the text of pages [start, stop) with pypdfium2, closing each page as it goes."""
+    pdf = pdfium.PdfDocument(file_bytes)
     try:
-        doc = docx.Document(file_path)
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting text from DOCX: {str(e)}")
-        return ""
+        parts = []
+        for index in range(start, stop):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            parts.append(textpage.get_text_range() + "\n")
+            textpage.close()
+            page.close()
+        return "".join(parts)
+    finally:
+        pdf.close()
 
-def extract_text_from_txt(file_path):
-    """Extract text from a TXT file."""
+def extract_text_from_docx(file):
+    """Extract text from a DOCX file (a path or a file-like object)."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
-    except Exception as e:
-        logger.error(f"Error extracting text from TXT: {str(e)}")
+        doc = docx.Document(file)
+        return "\n".join(para.text for para in doc.paragraphs)
+    except (PackageNotFoundError, BadZipFile, KeyError, XMLSyntaxError, ValueError):
+        # Uploads are untrusted; a malformed package or document XML yields no text
+        logger.exception("Error extracting text from DOCX")
         return ""
 
-def analyze_text_with_openai(text, api_key, document_type):
+def extract_text_from_txt(file_bytes):
+    """Extract text from the contents of a TXT file; invalid UTF-8 bytes are replaced."""
+    return file_bytes.decode('utf-8', errors='replace')
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def extract_text(file_bytes, file_extension):
+    """Extract text from an uploaded file's contents; cached by content so reruns don't re-parse it."""
+    if file_extension == 'pdf':
+        return extract_text_from_pdf(file_bytes)
+    elif file_extension == 'docx':
+        return extract_text_from_docx(io.BytesIO(file_bytes))
+    elif file_extension == 'txt':
+        return extract_text_from_txt(file_bytes)
+    return ""
+
+def analyze_text_with_openai(text, api_key, document_type, on_delta=None):
     """
     Analyze document text with OpenAI to extract game design knowledge.
     
@@ -59,6 +170,8 @@ def analyze_text_with_openai(text, api_key, document_type):
         text (str): The text to analyze
         api_key (str): OpenAI API key
         document_type (str): Type of document (GDD, Concept, Research, etc.)
+        on_delta (callable, optional): Called with each piece of the response as it streams in
+            (only for documents short enough to be analyzed in one request)
         
     Returns:
         dict: Extracted knowledge categorized by type
@@ -119,11 +232,65 @@ def analyze_text_with_openai(text, api_key, document_type):
         }
         """
     
-    # Limit text length to avoid token limits
-    max_text_length = 15000  # Adjust based on token limits
-    if len(text) > max_text_length:
-        text = text[:max_text_length] + "..."
+    # Long documents are analyzed in overlapping chunks, all at once, and the results merged
+    chunks = split_text(text)
+    if len(chunks) == 1:
+        # Merged too, so malformed and repeated items are dropped as for long documents
+        return merge_knowledge([_request_analysis(prompt, chunks[0], api_key, on_delta)])
+    
+    # Streaming progress is only shown for single-chunk documents; Streamlit elements
+    # can't be updated from the worker threads
+    with ThreadPoolExecutor(max_workers=min(len(chunks), MAX_CONCURRENT_ANALYSES)) as executor:
+        results = list(executor.map(lambda chunk: _request_analysis(prompt, chunk, api_key), chunks))
+    return merge_knowledge(results)
+
+def split_text(text):
+    """Split text into overlapping chunks for analysis, keeping at most MAX_ANALYSIS_CHUNKS."""
+    chunks = []
+    start = 0
+    while len(chunks) < MAX_ANALYSIS_CHUNKS:
+        end = start + ANALYSIS_CHUNK_SIZE
+        if end >= len(text):
+            chunks.append(text[start:])
+            return chunks
+        
+        # End the chunk at the last whitespace in its second half so words aren't split
+        boundary_from = start + ANALYSIS_CHUNK_SIZE // 2
+        cut = max(text.rfind(" ", boundary_from, end), text.rfind("\n", boundary_from, end))
+        if cut > 0:
+            end = cut
+        chunks.append(text[start:end])
+        start = end - ANALYSIS_CHUNK_OVERLAP
     
+    logger.warning(f"Document too long to analyze in full; analyzing the first {start + ANALYSIS_CHUNK_OVERLAP} characters")
+    return chunks
+
+def merge_knowledge(results):
+    """Merge the knowledge extracted from each chunk, dropping items repeated across chunks."""
+    merged = {}
+    seen = set()
+    for result in results:
+        for category, items in (result or {}).items():
+            if not isinstance(items, list):
+                continue
+            category_items = merged.setdefault(category, [])
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                name = str(item.get("name") or item.get("title") or "").strip().lower()
+                if name:
+                    if (category, name) in seen:
+                        continue
+                    seen.add((category, name))
+                category_items.append(item)
+    
+    # Every chunk failed
+    if not merged and all(result is None for result in results):
+        return None
+    return merged
+
+def _request_analysis(prompt, text, api_key, on_delta=None):
+    """Send one chunk of document text to OpenAI, returning the extracted knowledge or None."""
     try:
         headers = {
             "Content-Type": "application/json",
@@ -131,111 +298,167 @@ def analyze_text_with_openai(text, api_key, document_type):
         }
         
         data = {
-            "model": "gpt-4",
+            "model": ANALYSIS_MODEL,
             "messages": [
                 {"role": "system", "content": "You are a game design knowledge extraction assistant. Extract structured information from game design documents."},
                 {"role": "user", "content": prompt + "\n\nDocument text:\n" + text}
             ],
             "temperature": 0.3,
-            "max_tokens": 2000
+            "max_tokens": 2000,
+            "stream": True
         }
         
-        response = requests.post(
+        response = OPENAI_SESSION.post(
             "https://api.openai.com/v1/chat/completions",
             headers=headers,
-            json=data
+            json=data,
+            stream=True
         )
         
         if response.status_code == 200:
-            result = response.json()
-            content = result["choices"][0]["message"]["content"]
+            # The body is a server-sent event stream of "data: {...}" lines,
+            # each carrying the next piece of the response, ending with "data: [DONE]"
+            content = bytearray()
+            for line in response.iter_lines():
+                if not line.startswith(b"data: "):
+                    continue
+                event = line[len(b"data: "):]
+                if event == b"[DONE]":
+                    break
+                delta = orjson.loads(event)["choices"][0]["delta"].get("content")
+                if delta:
+                    content += delta.encode("utf-8")
+                    if on_delta:
+                        on_delta(delta)
             
             # Extract JSON from the response
-            try:
-                # Find JSON in the response
-                json_start = content.find('{')
-                json_end = content.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = content[json_start:json_end]
-                    return json.loads(json_str)
-                else:
-                    logger.error("No JSON found in OpenAI response")
-                    return None
-            except json.JSONDecodeError as e:
-                logger.error(f"Error parsing JSON from OpenAI response: {str(e)}")
-                return None
+            return parse_json_object(content)
         else:
             logger.error(f"OpenAI API error: {response.status_code} - {response.text}")
             return None
-    except Exception as e:
-        logger.error(f"Error calling OpenAI API: {str(e)}")
+    except (requests.RequestException, orjson.JSONDecodeError, KeyError, IndexError):
+        # Network failures and malformed stream events
+        logger.exception("Error calling OpenAI API")
         return None
 
+def parse_json_object(content):
+    """
+    Parse the first JSON object in a model response, ignoring any prose around it.
+    
+    Args:
+        content (bytes): The response text, UTF-8 encoded
+        
+    Returns:
+        dict: The parsed object, or None if the response contains no valid JSON object
+    """
+    json_start = content.find(b'{')
+    if json_start < 0:
+        logger.error("No JSON found in OpenAI response")
+        return None
+    
+    # Usually the object runs to the last closing brace, which orjson parses in one pass
+    json_end = content.rfind(b'}') + 1
+    try:
+        return orjson.loads(content[json_start:json_end])
+    except orjson.JSONDecodeError:
+        pass
+    
+    # Otherwise prose after the object contains a brace; decode just the first object
+    try:
+        knowledge_data, _ = json.JSONDecoder().raw_decode(content[json_start:].decode("utf-8", errors="replace"))
+        return knowledge_data
+    except json.JSONDecodeError as e:
+        logger.error(f"Error parsing JSON from OpenAI response: {str(e)}")
+        return None
+
+# Extracted category -> (knowledge base table, add_* method, extracted field -> column)
+KNOWLEDGE_CATEGORIES = {
+    "design_concepts": ("game_design_concepts", "add_design_concept", {
+        "name": "concept_name", "description": "description", "examples": "examples", "references": "source"
+    }),
+    "industry_practices": ("industry_practices", "add_industry_practice", {
+        "name": "practice_name", "description": "description", "companies": "case_studies", "outcomes": "benefits"
+    }),
+    "educational_resources": ("educational_resources", "add_educational_resource", {
+        "title": "title", "type": "content_type", "url": "url", "description": "description", "topics": "tags"
+    }),
+    "market_research": ("market_research", "add_market_research", {
+        "title": "title", "date": "date_of_research", "source": "source", "findings": "key_findings", "implications": "trends"
+    }),
+}
+
+def analyze_document(text, api_key, document_type, on_delta=None):
+    """
+    Analyze document text, reusing a recent analysis of the same text and document type.
+    
+    Args:
+        text (str): The text to analyze
+        api_key (str): OpenAI API key (not part of the cache key)
+        document_type (str): Type of document (GDD, Concept, Research, etc.)
+        on_delta (callable, optional): Called with each piece of the response as it streams in
+        
+    Returns:
+        dict: Extracted knowledge categorized by type, or None if the analysis failed
+    """
+    key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), document_type, ANALYSIS_MODEL)
+    with _analysis_cache_lock:
+        cached = _analysis_cache.get(key)
+        if cached and time.time() - cached[0] < ANALYSIS_CACHE_TTL:
+            _analysis_cache.move_to_end(key)
+            return cached[1]
+    
+    knowledge_data = analyze_text_with_openai(text, api_key, document_type, on_delta=on_delta)
+    
+    # Failed analyses are not cached, so the next click retries
+    if knowledge_data:
+        with _analysis_cache_lock:
+            _analysis_cache[key] = (time.time(), knowledge_data)
+            _analysis_cache.move_to_end(key)
+            if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+                _analysis_cache.popitem(last=False)
+    return knowledge_data
+
+def clear_analysis_cache():
+    """Forget all cached analyses so documents are re-analyzed."""
+    with _analysis_cache_lock:
+        _analysis_cache.clear()
+
 def save_extracted_knowledge(knowledge_data, knowledge_base):
     """Save extracted knowledge to the knowledge base."""
     if not knowledge_data:
         return 0
     
-    count = 0
+    # Map every extracted item onto its table's columns
+    entries = {}
+    for category, (table, _, columns) in KNOWLEDGE_CATEGORIES.items():
+        items = knowledge_data.get(category)
+        if isinstance(items, list):
+            entries[table] = [
+                {column: item.get(field, "Other" if field == "type" else "") for field, column in columns.items()}
+                for item in items if isinstance(item, dict)
+            ]
     
-    # Save design concepts
-    if "design_concepts" in knowledge_data:
-        for concept in knowledge_data["design_concepts"]:
-            try:
-                knowledge_base.add_design_concept(
-                    concept.get("name", ""),
-                    concept.get("description", ""),
-                    concept.get("examples", ""),
-                    concept.get("references", "")
-                )
-                count += 1
-            except Exception as e:
-                logger.error(f"Error saving design concept: {str(e)}")
-    
-    # Save industry practices
-    if "industry_practices" in knowledge_data:
-        for practice in knowledge_data["industry_practices"]:
-            try:
-                knowledge_base.add_industry_practice(
-                    practice.get("name", ""),
-                    practice.get("description", ""),
-                    practice.get("companies", ""),
-                    practice.get("outcomes", "")
-                )
-                count += 1
-            except Exception as e:
-                logger.error(f"Error saving industry practice: {str(e)}")
-    
-    # Save educational resources
-    if "educational_resources" in knowledge_data:
-        for resource in knowledge_data["educational_resources"]:
-            try:
-                knowledge_base.add_educational_resource(
-                    resource.get("title", ""),
-                    resource.get("type", "Other"),
-                    resource.get("url", ""),
-                    resource.get("description", ""),
-                    resource.get("topics", "")
-                )
-                count += 1
-            except Exception as e:
-                logger.error(f"Error saving educational resource: {str(e)}")
+    # Save everything in one transaction
+    try:
+        count = knowledge_base.add_knowledge_bulk(entries)
+        search_knowledge.clear()
+        return count
+    except sqlite3.Error:
+        logger.exception("Error saving knowledge in bulk, saving items one at a time")
     
-    # Save market research
-    if "market_research" in knowledge_data:
-        for research in knowledge_data["market_research"]:
+    # Fall back to saving item by item so one bad item doesn't lose the rest
+    count = 0
+    for table, add_method, _ in KNOWLEDGE_CATEGORIES.values():
+        for entry in entries.get(table, []):
             try:
-                knowledge_base.add_market_research(
-                    research.get("title", ""),
-                    research.get("date", ""),
-                    research.get("source", ""),
-                    research.get("findings", ""),
-                    research.get("implications", "")
-                )
+                getattr(knowledge_base, add_method)(entry)
                 count += 1
-            except Exception as e:
-                logger.error(f"Error saving market research: {str(e)}")
+            except (sqlite3.Error, ValueError):
+                logger.exception(f"Error saving {table} entry")
     
+    # Cached searches would otherwise miss the new entries until they expire
+    if count:
+        search_knowledge.clear()
     return count
 
 def display_document_uploader():
@@ -243,12 +466,16 @@ def display_document_uploader():
     st.title("Game Design Document Uploader")
     st.write("Upload game design documents to extract knowledge for Thomas AI.")
     
+    # Drop the shared handle so the next line re-creates it (e.g. after the database file was replaced)
+    if st.sidebar.button("Reconnect Knowledge Base"):
+        get_knowledge_base.clear()
+    
     # Initialize knowledge base
     try:
-        knowledge_base = GameDesignKnowledgeBase()
-    except Exception as e:
+        knowledge_base = get_knowledge_base()
+    except (sqlite3.Error, OSError) as e:
         st.error(f"Error connecting to knowledge base: {str(e)}")
-        logger.error(f"Error initializing knowledge base: {str(e)}")
+        logger.exception("Error initializing knowledge base")
         return
     
     # Document type selection
@@ -264,30 +491,22 @@ def display_document_uploader():
     api_key = st.text_input("OpenAI API Key", type="password")
     
     if uploaded_file is not None:
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            tmp_path = tmp_file.name
-        
         # Extract text based on file type
         file_extension = uploaded_file.name.split('.')[-1].lower()
-        if file_extension == 'pdf':
-            text = extract_text_from_pdf(tmp_path)
-        elif file_extension == 'docx':
-            text = extract_text_from_docx(tmp_path)
-        elif file_extension == 'txt':
-            text = extract_text_from_txt(tmp_path)
+        if file_extension in ('pdf', 'docx', 'txt'):
+            text = extract_text(uploaded_file.getvalue(), file_extension)
         else:
             text = ""
             st.error("Unsupported file format")
         
-        # Clean up the temporary file
-        os.unlink(tmp_path)
-        
         # Display text preview
         with st.expander("Document Text Preview"):
             st.text_area("Extracted Text", text[:1000] + "..." if len(text) > 1000 else text, height=200)
         
+        # Analyses are cached by document text; this forces the next extraction to call OpenAI again
+        if st.button("Clear Analysis Cache"):
+            clear_analysis_cache()
+        
         # Process button
         if st.button("Extract Knowledge"):
             if not api_key:
@@ -296,8 +515,22 @@ def display_document_uploader():
                 st.error("No text could be extracted from the document")
             else:
                 with st.spinner("Analyzing document and extracting knowledge..."):
+                    # Show the response as it streams in
+                    preview = st.empty()
+                    streamed = []
+                    last_update = [0.0]
+                    
+                    def show_delta(delta):
+                        # Redraw at most every STREAM_PREVIEW_INTERVAL seconds, not once per token
+                        streamed.append(delta)
+                        now = time.monotonic()
+                        if now - last_update[0] >= STREAM_PREVIEW_INTERVAL:
+                            last_update[0] = now
+                            preview.code("".join(streamed), language="json")
+                    
                     # Analyze text with OpenAI
-                    knowledge_data = analyze_text_with_openai(text, api_key, document_type)
+                    knowledge_data = analyze_document(text, api_key, document_type, on_delta=show_delta)
+                    preview.empty()
                     
                     if knowledge_data:
                         # Display extracted knowledge
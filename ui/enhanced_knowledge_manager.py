@@ -1,14 +1,15 @@
 import streamlit as st
-import pandas as pd
+import orjson
 import requests
-import json
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
-from ui.components.knowledge_graph import taxonomy_tree_visualization, concept_relationships_visualization
 
 # Configure logging
 logging.basicConfig(
@@ -20,64 +21,65 @@ logger = logging.getLogger("enhanced_knowledge_manager")
 # API Base URL
 API_BASE_URL = "http://localhost:8002"
 
+# One keep-alive session for every API call, so requests reuse pooled connections
+SESSION = requests.Session()
+SESSION.headers.update({"Accept": "application/json"})
+_api_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    # Only idempotent GETs are retried; a retried POST could create a node twice
+    max_retries=Retry(total=2, backoff_factor=0.2, allowed_methods=frozenset(["GET"]))
+)
+SESSION.mount("http://", _api_adapter)
+SESSION.mount("https://", _api_adapter)
+
+# st.rerun replaced st.experimental_rerun in Streamlit 1.27
+rerun = getattr(st, "rerun", None) or st.experimental_rerun
+
 # Cache TTL in seconds
 CACHE_TTL = 300
-_cache = {}
 
-def get_from_cache(key, default=None):
-    """Get a value from the cache if it's not expired."""
-    if key in _cache:
-        timestamp, value = _cache[key]
-        if time.time() - timestamp < CACHE_TTL:
-            return value
-    return default
+def fetch_json(endpoint, params=None):
+    """GET an API endpoint, returning the parsed JSON (raises on failure or a non-200 status)."""
+    url = f"{API_BASE_URL}{endpoint}"
+    response = SESSION.get(url, params=params, timeout=10)
+    
+    if response.status_code != 200:
+        raise RuntimeError(f"status {response.status_code}: {response.text}")
+    return orjson.loads(response.content)
 
-def set_in_cache(key, value):
-    """Set a value in the cache with current timestamp."""
-    _cache[key] = (time.time(), value)
-    return value
+# Failures raise instead of returning, so they are never cached
+cached_fetch_json = st.cache_data(ttl=CACHE_TTL, show_spinner=False)(fetch_json)
 
 def api_get(endpoint, params=None, use_cache=True):
     """Get data from the API with caching."""
-    cache_key = f"get:{endpoint}:{json.dumps(params) if params else ''}"
-    
-    # Check cache first
-    if use_cache:
-        cached = get_from_cache(cache_key)
-        if cached is not None:
-            return cached
-    
-    # Make API request
+    # Sorted (key, value) pairs hash cheaply and requests accepts them as query params
+    params = tuple(sorted(params.items())) if params else None
+    fetch = cached_fetch_json if use_cache else fetch_json
     try:
-        url = f"{API_BASE_URL}{endpoint}"
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if use_cache:
-                set_in_cache(cache_key, data)
-            return data
-        else:
-            logger.error(f"API request to {endpoint} failed with status {response.status_code}: {response.text}")
-            return None
+        return fetch(endpoint, params)
     except Exception as e:
         logger.error(f"API request to {endpoint} failed: {str(e)}")
         return None
 
+def api_get_many(calls):
+    """Run several (endpoint, use_cache) GETs concurrently, returning a dict of endpoint -> data (or None)."""
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = executor.map(lambda call: api_get(call[0], use_cache=call[1]), calls)
+        return dict(zip((endpoint for endpoint, _ in calls), results))
+
 def api_post(endpoint, data, use_cache=False):
     """Post data to the API."""
     try:
         url = f"{API_BASE_URL}{endpoint}"
-        response = requests.post(url, json=data, timeout=10)
+        response = SESSION.post(url, json=data, timeout=10)
         
         if response.status_code in (200, 201):
-            result = response.json()
+            result = orjson.loads(response.content)
             
-            # Clear cache for GET endpoints related to this resource
+            # Clear cached GETs so the change shows up
             if endpoint.startswith("/v2/knowledge"):
-                for key in list(_cache.keys()):
-                    if key.startswith("get:/v2/knowledge"):
-                        del _cache[key]
+                cached_fetch_json.clear()
             
             return result
         else:
@@ -87,12 +89,64 @@ def api_post(endpoint, data, use_cache=False):
         logger.error(f"API request to {endpoint} failed: {str(e)}")
         return None
 
+# Placeholder overview data until the API exposes activity and graph endpoints; module
+# constants so reruns don't rebuild them
+SAMPLE_ACTIVITY = [
+    {"type": "concept", "action": "created", "name": "Progression Systems", "user": "admin", "timestamp": "2023-05-10T14:23:45"},
+    {"type": "practice", "action": "updated", "name": "Agile Game Development", "user": "john_doe", "timestamp": "2023-05-09T16:12:30"},
+    {"type": "resource", "action": "verified", "name": "Game Design Patterns", "user": "reviewer1", "timestamp": "2023-05-08T09:45:22"},
+    {"type": "research", "action": "created", "name": "Mobile Gaming Trends 2023", "user": "analyst", "timestamp": "2023-05-07T11:34:12"},
+    {"type": "concept", "action": "relationship_added", "name": "Game Loops", "related_to": "Progression Systems", "user": "admin", "timestamp": "2023-05-06T15:22:10"}
+]
+
+SAMPLE_GRAPH_NODES = [
+    {"id": 1, "label": "Game Loops", "description": "Core repeatable activities", "level": 1},
+    {"id": 2, "label": "Progression Systems", "description": "How players advance", "level": 1},
+    {"id": 3, "label": "Monetization", "description": "Revenue generation", "level": 1},
+    {"id": 4, "label": "F2P", "description": "Free to play model", "level": 2},
+    {"id": 5, "label": "Premium", "description": "Paid upfront model", "level": 2},
+    {"id": 6, "label": "XP Systems", "description": "Experience point based progression", "level": 2},
+    {"id": 7, "label": "Core Loop", "description": "Main gameplay loop", "level": 2}
+]
+
+SAMPLE_GRAPH_EDGES = [
+    {"source": 1, "target": 7, "label": "has_subtype"},
+    {"source": 2, "target": 6, "label": "has_example"},
+    {"source": 3, "target": 4, "label": "has_subtype"},
+    {"source": 3, "target": 5, "label": "has_subtype"},
+    {"source": 1, "target": 2, "label": "relates_to"},
+    {"source": 3, "target": 2, "label": "can_influence"}
+]
+
+@st.cache_data(show_spinner=False)
+def activity_frame():
+    """Recent activity table, built once"""
+    import pandas as pd
+    return pd.DataFrame(SAMPLE_ACTIVITY)
+
+# Tables longer than this show a row-count slider instead of sending every row to the browser
+TABLE_ROW_LIMIT = 200
+
+def display_table(df, key):
+    """Show a table, capped at a user-chosen number of rows when it is long."""
+    if len(df) > TABLE_ROW_LIMIT:
+        rows = st.slider("Rows to show", 50, min(len(df), 1000), TABLE_ROW_LIMIT, key=f"{key}_rows")
+        st.caption(f"Showing {rows} of {len(df)} rows")
+        df = df.head(rows)
+    st.dataframe(df, use_container_width=True)
+
 def display_enhanced_knowledge_manager():
     """Display the enhanced knowledge management interface."""
     st.title("Enhanced Knowledge Management")
     
+    # Fetch everything the tabs need up front, concurrently, instead of tab by tab
+    data = api_get_many([
+        ("/health", False),
+        ("/v2/knowledge/taxonomy", True),
+    ])
+    
     # Check if API is available
-    health = api_get("/health", use_cache=False)
+    health = data["/health"]
     if not health or health.get("status") != "healthy":
         st.error("Cannot connect to the API. Please make sure the API server is running.")
         st.error(f"API Health: {health}")
@@ -105,7 +159,7 @@ def display_enhanced_knowledge_manager():
         display_overview()
     
     with tabs[1]:
-        display_taxonomy_manager()
+        display_taxonomy_manager(data["/v2/knowledge/taxonomy"])
     
     with tabs[2]:
         display_concepts_manager()
@@ -146,52 +200,19 @@ def display_overview():
     st.subheader("Recent Activity")
     
     # TODO: Get actual activity from API
-    # For now, use mock data
-    recent_activity = [
-        {"type": "concept", "action": "created", "name": "Progression Systems", "user": "admin", "timestamp": "2023-05-10T14:23:45"},
-        {"type": "practice", "action": "updated", "name": "Agile Game Development", "user": "john_doe", "timestamp": "2023-05-09T16:12:30"},
-        {"type": "resource", "action": "verified", "name": "Game Design Patterns", "user": "reviewer1", "timestamp": "2023-05-08T09:45:22"},
-        {"type": "research", "action": "created", "name": "Mobile Gaming Trends 2023", "user": "analyst", "timestamp": "2023-05-07T11:34:12"},
-        {"type": "concept", "action": "relationship_added", "name": "Game Loops", "related_to": "Progression Systems", "user": "admin", "timestamp": "2023-05-06T15:22:10"}
-    ]
-    
-    activity_df = pd.DataFrame(recent_activity)
-    st.dataframe(activity_df)
+    display_table(activity_frame(), key="recent_activity")
     
     # Display visualization
     st.subheader("Knowledge Graph")
     
     # TODO: Get actual data from API
-    # For now, use mock data for visualization
-    nodes = [
-        {"id": 1, "label": "Game Loops", "description": "Core repeatable activities", "level": 1},
-        {"id": 2, "label": "Progression Systems", "description": "How players advance", "level": 1},
-        {"id": 3, "label": "Monetization", "description": "Revenue generation", "level": 1},
-        {"id": 4, "label": "F2P", "description": "Free to play model", "level": 2},
-        {"id": 5, "label": "Premium", "description": "Paid upfront model", "level": 2},
-        {"id": 6, "label": "XP Systems", "description": "Experience point based progression", "level": 2},
-        {"id": 7, "label": "Core Loop", "description": "Main gameplay loop", "level": 2}
-    ]
-    
-    edges = [
-        {"source": 1, "target": 7, "label": "has_subtype"},
-        {"source": 2, "target": 6, "label": "has_example"},
-        {"source": 3, "target": 4, "label": "has_subtype"},
-        {"source": 3, "target": 5, "label": "has_subtype"},
-        {"source": 1, "target": 2, "label": "relates_to"},
-        {"source": 3, "target": 2, "label": "can_influence"}
-    ]
-    
     from ui.components.knowledge_graph import knowledge_graph
-    knowledge_graph(nodes, edges, title="Knowledge Graph Overview", height=400)
+    knowledge_graph(SAMPLE_GRAPH_NODES, SAMPLE_GRAPH_EDGES, title="Knowledge Graph Overview", height=400)
 
-def display_taxonomy_manager():
-    """Display the taxonomy management interface."""
+def display_taxonomy_manager(taxonomy_tree):
+    """Display the taxonomy management interface for the given taxonomy tree."""
     st.header("Taxonomy Management")
     
-    # Get taxonomy tree from API
-    taxonomy_tree = api_get("/v2/knowledge/taxonomy")
-    
     col1, col2 = st.columns([1, 2])
     
     with col1:
@@ -203,23 +224,14 @@ def display_taxonomy_manager():
             description = st.text_area("Description")
             
             # Get existing taxonomy nodes for parent selection
-            all_nodes = []
-            if taxonomy_tree:
-                def extract_nodes(nodes):
-                    result = []
-                    for node in nodes:
-                        result.append((node['id'], node['name']))
-                        if 'children' in node and node['children']:
-                            result.extend(extract_nodes(node['children']))
-                    return result
-                
-                all_nodes = extract_nodes(taxonomy_tree)
+            all_nodes = extract_nodes(taxonomy_tree) if taxonomy_tree else []
             
             parent_options = [("None", "No Parent (Root Node)")] + all_nodes
+            parent_labels = dict(parent_options)
             parent_selection = st.selectbox(
                 "Parent Node", 
                 options=[opt[0] for opt in parent_options],
-                format_func=lambda x: next((opt[1] for opt in parent_options if opt[0] == x), str(x))
+                format_func=lambda x: parent_labels.get(x, str(x))
             )
             
             parent_id = None if parent_selection == "None" else parent_selection
@@ -237,11 +249,8 @@ def display_taxonomy_manager():
                     
                     if response:
                         st.success(f"Created taxonomy node: {name}")
-                        # Clear cache to refresh the taxonomy tree
-                        if "get:/v2/knowledge/taxonomy" in _cache:
-                            del _cache["get:/v2/knowledge/taxonomy"]
-                        # Rerun to refresh the page
-                        st.experimental_rerun()
+                        # api_post already cleared the cached taxonomy tree; rerun to refresh the page
+                        rerun()
                     else:
                         st.error("Failed to create taxonomy node")
                 else:
@@ -253,6 +262,7 @@ def display_taxonomy_manager():
         
         if taxonomy_tree:
             # Visualization using the knowledge graph component
+            from ui.components.knowledge_graph import taxonomy_tree_visualization
             taxonomy_tree_visualization(taxonomy_tree, title="Taxonomy Hierarchy", height=600)
             
             # Expandable tree view
@@ -285,6 +295,17 @@ def display_taxonomy_manager():
         else:
             st.info("No taxonomy nodes found. Create some using the form on the left.")
 
+def extract_nodes(roots):
+    """List (id, name) for every node of a taxonomy tree, parents before their children."""
+    nodes = []
+    # Reversed onto the stack so nodes pop off in tree order
+    stack = list(reversed(roots))
+    while stack:
+        node = stack.pop()
+        nodes.append((node['id'], node['name']))
+        stack.extend(reversed(node.get('children') or ()))
+    return nodes
+
 def display_concepts_manager():
     """Display the game design concepts management interface."""
     st.header("Game Design Concepts")
@@ -323,6 +344,7 @@ def display_concepts_manager():
         {"source_id": 1, "target_id": 4, "relationship_type": "feeds", "strength": 0.6}
     ]
     
+    from ui.components.knowledge_graph import concept_relationships_visualization
     concept_relationships_visualization(concepts, relationships)
 
 def display_practices_manager():
@@ -382,19 +404,16 @@ def display_search_interface():
             st.success(f"Found {len(results['results'])} results")
             
             # Group results by type
-            grouped_results = {}
+            grouped_results = defaultdict(list)
             for result in results["results"]:
-                result_type = result["type"]
-                if result_type not in grouped_results:
-                    grouped_results[result_type] = []
-                grouped_results[result_type].append(result)
+                grouped_results[result["type"]].append(result)
             
             # Display results by type in tabs
             if grouped_results:
                 result_tabs = st.tabs(list(grouped_results.keys()))
                 
-                for i, (result_type, type_results) in enumerate(grouped_results.items()):
-                    with result_tabs[i]:
+                for result_tab, type_results in zip(result_tabs, grouped_results.values()):
+                    with result_tab:
                         for j, result in enumerate(type_results):
                             score = result.get("score", 0)
                             with st.expander(f"{j+1}. {_get_result_title(result)} (Score: {score:.2f})"):
@@ -404,21 +423,18 @@ def display_search_interface():
         else:
             st.warning("No results found or search failed.")
 
+# Search result type -> (data field holding its title, fallback title)
+RESULT_TITLE_FIELDS = {
+    "concept": ("name", "Unnamed Concept"),
+    "practice": ("name", "Unnamed Practice"),
+    "resource": ("title", "Unnamed Resource"),
+    "research": ("title", "Unnamed Research"),
+}
+
 def _get_result_title(result):
     """Get a title for a search result based on its type."""
-    result_type = result["type"]
-    data = result["data"]
-    
-    if result_type == "concept":
-        return data.get("name", "Unnamed Concept")
-    elif result_type == "practice":
-        return data.get("name", "Unnamed Practice")
-    elif result_type == "resource":
-        return data.get("title", "Unnamed Resource")
-    elif result_type == "research":
-        return data.get("title", "Unnamed Research")
-    else:
-        return "Unknown Result"
+    field, default = RESULT_TITLE_FIELDS.get(result["type"], (None, "Unknown Result"))
+    return result["data"].get(field, default) if field else default
 
 if __name__ == "__main__":
     display_enhanced_knowledge_manager() 
\ No newline at end of file
@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
-from services.knowledge_base import GameDesignKnowledgeBase
 import os
 import logging
-from ui.document_uploader import display_document_uploader
+from ui.document_uploader import display_document_uploader, get_knowledge_base, search_knowledge
 
 # Set up logging
 logging.basicConfig(
@@ -12,6 +11,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Search result columns to show per section: knowledge base column -> label
+CONCEPT_COLUMNS = {"concept_name": "Name", "description": "Description", "examples": "Examples", "source": "References"}
+PRACTICE_COLUMNS = {"practice_name": "Name", "description": "Description", "case_studies": "Companies", "benefits": "Outcomes"}
+RESOURCE_COLUMNS = {"title": "Title", "content_type": "Type", "description": "Description", "url": "URL", "tags": "Topics"}
+RESEARCH_COLUMNS = {"title": "Title", "date_of_research": "Date", "source": "Source", "key_findings": "Key Findings", "trends": "Implications"}
+
+def display_search_results(results, columns, key):
+    """Show search results as one table, with the full text of a chosen result below it."""
+    # Built column by column, so pandas gets one list per column instead of inferring from each row
+    results_df = pd.DataFrame({label: [result.get(column) for result in results] for column, label in columns.items()})
+    st.dataframe(results_df, use_container_width=True, hide_index=True)
+    
+    # One detail pane for the selected row, rather than an expander per result
+    selected = st.selectbox(
+        "Show details for",
+        range(len(results_df)),
+        format_func=lambda i: str(results_df.iat[i, 0]),
+        key=f"{key}_details"
+    )
+    with st.expander("Details", expanded=True):
+        for label, value in results_df.iloc[selected].items():
+            if pd.notna(value) and value != "":
+                st.markdown(f"**{label}:** {value}")
+
 def display_knowledge_manager():
     """
     Display the knowledge management interface for game design knowledge.
@@ -20,7 +43,7 @@ def display_knowledge_manager():
     
     # Initialize knowledge base
     try:
-        knowledge_base = GameDesignKnowledgeBase()
+        knowledge_base = get_knowledge_base()
         st.success("Knowledge base connected successfully")
     except Exception as e:
         st.error(f"Error connecting to knowledge base: {str(e)}")
@@ -69,6 +92,8 @@ def display_game_design_concepts(knowledge_base):
                         concept_references
                     )
                     st.success(f"Added concept: {concept_name}")
+                    # New entries must show up in searches made before they were added
+                    search_knowledge.clear()
                     logger.info(f"Added game design concept: {concept_name}")
                 except Exception as e:
                     st.error(f"Error adding concept: {str(e)}")
@@ -80,18 +105,9 @@ def display_game_design_concepts(knowledge_base):
     
     if search_query:
         try:
-            results = knowledge_base.search_knowledge_base(search_query, "game_design_concepts")
+            results = search_knowledge(knowledge_base, search_query, "game_design_concepts")
             if results:
-                for result in results:
-                    with st.expander(f"{result['name']}"):
-                        st.write("**Description:**")
-                        st.write(result['description'])
-                        if result['examples']:
-                            st.write("**Examples:**")
-                            st.write(result['examples'])
-                        if result['references']:
-                            st.write("**References:**")
-                            st.write(result['references'])
+                display_search_results(results, CONCEPT_COLUMNS, key="game_design_concepts")
             else:
                 st.info("No matching concepts found.")
         except Exception as e:
@@ -121,6 +137,8 @@ def display_industry_practices(knowledge_base):
                         practice_outcomes
                     )
                     st.success(f"Added practice: {practice_name}")
+                    # New entries must show up in searches made before they were added
+                    search_knowledge.clear()
                     logger.info(f"Added industry practice: {practice_name}")
                 except Exception as e:
                     st.error(f"Error adding practice: {str(e)}")
@@ -132,18 +150,9 @@ def display_industry_practices(knowledge_base):
     
     if search_query:
         try:
-            results = knowledge_base.search_knowledge_base(search_query, "industry_practices")
+            results = search_knowledge(knowledge_base, search_query, "industry_practices")
             if results:
-                for result in results:
-                    with st.expander(f"{result['name']}"):
-                        st.write("**Description:**")
-                        st.write(result['description'])
-                        if result['companies']:
-                            st.write("**Companies:**")
-                            st.write(result['companies'])
-                        if result['outcomes']:
-                            st.write("**Outcomes:**")
-                            st.write(result['outcomes'])
+                display_search_results(results, PRACTICE_COLUMNS, key="industry_practices")
             else:
                 st.info("No matching practices found.")
         except Exception as e:
@@ -176,6 +185,8 @@ def display_educational_resources(knowledge_base):
                         resource_topics
                     )
                     st.success(f"Added resource: {resource_title}")
+                    # New entries must show up in searches made before they were added
+                    search_knowledge.clear()
                     logger.info(f"Added educational resource: {resource_title}")
                 except Exception as e:
                     st.error(f"Error adding resource: {str(e)}")
@@ -187,18 +198,9 @@ def display_educational_resources(knowledge_base):
     
     if search_query:
         try:
-            results = knowledge_base.search_knowledge_base(search_query, "educational_resources")
+            results = search_knowledge(knowledge_base, search_query, "educational_resources")
             if results:
-                for result in results:
-                    with st.expander(f"{result['title']} ({result['type']})"):
-                        st.write("**Description:**")
-                        st.write(result['description'])
-                        if result['url']:
-                            st.write("**URL:**")
-                            st.markdown(f"[{result['url']}]({result['url']})")
-                        if result['topics']:
-                            st.write("**Topics:**")
-                            st.write(result['topics'])
+                display_search_results(results, RESOURCE_COLUMNS, key="educational_resources")
             else:
                 st.info("No matching resources found.")
         except Exception as e:
@@ -230,6 +232,8 @@ def display_market_research(knowledge_base):
                         research_implications
                     )
                     st.success(f"Added research: {research_title}")
+                    # New entries must show up in searches made before they were added
+                    search_knowledge.clear()
                     logger.info(f"Added market research: {research_title}")
                 except Exception as e:
                     st.error(f"Error adding research: {str(e)}")
@@ -241,17 +245,9 @@ def display_market_research(knowledge_base):
     
     if search_query:
         try:
-            results = knowledge_base.search_knowledge_base(search_query, "market_research")
+            results = search_knowledge(knowledge_base, search_query, "market_research")
             if results:
-                for result in results:
-                    with st.expander(f"{result['title']} ({result['date']})"):
-                        if result['source']:
-                            st.write(f"**Source:** {result['source']}")
-                        st.write("**Key Findings:**")
-                        st.write(result['findings'])
-                        if result['implications']:
-                            st.write("**Implications:**")
-                            st.write(result['implications'])
+                display_search_results(results, RESEARCH_COLUMNS, key="market_research")
             else:
                 st.info("No matching research found.")
         except Exception as e:
@@ -4,6 +4,8 @@ import pandas as pd
 import sys
 import os
 from datetime import datetime
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
 
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,13 +13,29 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # API URL
 API_BASE_URL = "http://localhost:8002"
 
+# Keep-alive session so the employee list and payment lookups reuse connections
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+def _get_json(path):
+    """GET an API path and return the decoded JSON, raising on HTTP errors"""
+    response = _SESSION.get(f"{API_BASE_URL}{path}", timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+# Every selectbox change reruns the page; reuse responses for a minute.
+# Failures raise, so they are never cached
+_cached_get_json = st.cache_data(ttl=60, show_spinner=False)(_get_json)
+
+@lru_cache(maxsize=None)
 def get_payment_method_icon(method):
     """Return the appropriate payment method icon"""
-    if "paypal" in method.lower():
+    method = method.lower()
+    if "paypal" in method:
         return "https://www.paypalobjects.com/webstatic/mktg/logo/pp_cc_mark_37x23.jpg"
-    elif "crypto" in method.lower() or "sol" in method.lower():
+    elif "crypto" in method or "sol" in method:
         return "https://cryptologos.cc/logos/solana-sol-logo.png"
-    elif "bank" in method.lower():
+    elif "bank" in method:
         return "https://cdn-icons-png.flaticon.com/512/2830/2830284.png"
     else:
         return "https://cdn-icons-png.flaticon.com/512/1019/1019607.png"
@@ -27,12 +45,10 @@ def display_payment_details():
     
     # Get all employees
     try:
-        response = requests.get(f"{API_BASE_URL}/payments/employees")
-        if response.status_code == 200:
-            employees = response.json()
-        else:
-            st.error("Failed to fetch employees")
-            return
+        employees = _cached_get_json("/payments/employees")
+    except requests.HTTPError:
+        st.error("Failed to fetch employees")
+        return
     except Exception as e:
         st.error(f"Error connecting to API: {str(e)}")
         return
@@ -43,12 +59,10 @@ def display_payment_details():
     if selected_employee:
         # Get payments for selected employee
         try:
-            response = requests.get(f"{API_BASE_URL}/payments/employee/{selected_employee}")
-            if response.status_code == 200:
-                payments = response.json()
-            else:
-                st.error("Failed to fetch payments for employee")
-                return
+            payments = _cached_get_json(f"/payments/employee/{selected_employee}")
+        except requests.HTTPError:
+            st.error("Failed to fetch payments for employee")
+            return
         except Exception as e:
             st.error(f"Error connecting to API: {str(e)}")
             return
@@ -58,8 +72,12 @@ def display_payment_details():
         
         # Calculate total payments
         if payments:
-            total_usd = sum(p["amount"] for p in payments if p["currency"] == "USD")
-            total_sol = sum(p["amount"] for p in payments if p["currency"] == "SOL")
+            # Sum per currency in a single pass over the payments
+            totals = {}
+            for p in payments:
+                totals[p["currency"]] = totals.get(p["currency"], 0) + p["amount"]
+            total_usd = totals.get("USD", 0)
+            total_sol = totals.get("SOL", 0)
             
             # Display totals
             col1, col2 = st.columns(2)
@@ -71,25 +89,30 @@ def display_payment_details():
             # Display payment history
             st.subheader("Payment History")
             
-            # Create expandable sections for each payment
-            for payment in sorted(payments, key=lambda x: x.get("created_at", ""), reverse=True):
-                with st.expander(f"Payment on {payment.get('created_at', 'Unknown Date')} - {payment.get('currency')} {payment.get('amount')}"):
-                    cols = st.columns([1, 3])
-                    
-                    # Payment method icon
-                    with cols[0]:
-                        st.image(get_payment_method_icon(payment.get("payment_method", "")), width=100)
-                    
-                    # Payment details
-                    with cols[1]:
-                        st.write(f"**Amount:** {payment.get('currency')} {payment.get('amount')}")
-                        st.write(f"**Method:** {payment.get('payment_method', 'Unknown')}")
-                        st.write(f"**Status:** {payment.get('status', 'Unknown')}")
-                        st.write(f"**Transaction ID:** {payment.get('transaction_id', 'N/A')}")
-                        
-                        # Add payment link if available
-                        if payment.get("payment_link"):
-                            st.write(f"**Payment Link:** [View Transaction]({payment.get('payment_link')})")
+            # One table row per payment, newest first, instead of an expander
+            # with several write calls per payment
+            payments.sort(key=lambda x: x.get("created_at") or "", reverse=True)
+            detail_df = pd.DataFrame([
+                {
+                    "Date": payment.get("created_at", "Unknown Date"),
+                    "Method Logo": get_payment_method_icon(payment.get("payment_method", "")),
+                    "Amount": f"{payment.get('currency')} {payment.get('amount')}",
+                    "Method": payment.get("payment_method", "Unknown"),
+                    "Status": payment.get("status", "Unknown"),
+                    "Transaction ID": payment.get("transaction_id", "N/A"),
+                    "Payment Link": payment.get("payment_link")
+                }
+                for payment in payments
+            ])
+            st.dataframe(
+                detail_df,
+                column_config={
+                    "Method Logo": st.column_config.ImageColumn("Method Logo"),
+                    "Payment Link": st.column_config.LinkColumn("Payment Link")
+                },
+                hide_index=True,
+                use_container_width=True
+            )
         else:
             st.info(f"No payments found for {selected_employee}")
 
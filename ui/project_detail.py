@@ -4,18 +4,76 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+API_BASE_URL = "http://localhost:8002"
+
+# Keep-alive session shared by every rerun so requests reuse pooled connections
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+def _get_json(path):
+    """GET an API path and return the decoded JSON, raising on HTTP errors"""
+    response = _SESSION.get(f"{API_BASE_URL}{path}", timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+# Reruns within a minute reuse the last responses instead of hitting the API again;
+# failures raise, so they are never cached
+_cached_get_json = st.cache_data(ttl=60, show_spinner=False)(_get_json)
+
+# Figures are rebuilt only when their data changes, not on every rerun
+@st.cache_data(ttl=300, show_spinner=False)
+def build_category_pie(pie_data):
+    """Pie chart of expense totals per category"""
+    return px.pie(
+        pie_data, 
+        values='Amount', 
+        names='Category',
+        title='Expenses by Category',
+        color_discrete_sequence=px.colors.sequential.Viridis
+    )
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_cumulative_line(time_data, total_budget):
+    """Cumulative spending line from per-date totals, with the budget as a reference line"""
+    time_data = time_data.assign(Date=pd.to_datetime(time_data['Date'])).sort_values('Date')
+    
+    # Create cumulative spending line chart
+    time_data['Cumulative'] = time_data['Amount'].cumsum()
+    
+    fig = px.line(
+        time_data, 
+        x='Date', 
+        y='Cumulative',
+        title='Cumulative Spending Over Time',
+        labels={'Cumulative': 'Cumulative Spending ($)', 'Date': ''},
+        color_discrete_sequence=['#19A7CE']
+    )
+    
+    # Add total budget reference line
+    fig.add_hline(
+        y=total_budget,
+        line_dash="dash",
+        line_color="red",
+        annotation_text="Total Budget"
+    )
+    return fig
 
 def display_project_detail(project_id):
-    API_BASE_URL = "http://localhost:8002"
+    # Fire the project, expenses and assets requests together
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        f_project = executor.submit(_cached_get_json, f"/projects/{project_id}")
+        f_expenses = executor.submit(_cached_get_json, f"/projects/{project_id}/expenses")
+        f_assets = executor.submit(_cached_get_json, f"/projects/{project_id}/assets")
     
     # Fetch project details
     try:
-        response = requests.get(f"{API_BASE_URL}/projects/{project_id}")
-        if response.status_code == 200:
-            project = response.json()
-        else:
-            st.error(f"Failed to fetch project details: {response.status_code}")
-            return
+        project = f_project.result()
+    except requests.HTTPError as e:
+        st.error(f"Failed to fetch project details: {e.response.status_code}")
+        return
     except Exception as e:
         st.error(f"Connection error: {str(e)}")
         return
@@ -34,12 +92,8 @@ def display_project_detail(project_id):
     
     # Fetch expenses for this project
     try:
-        response = requests.get(f"{API_BASE_URL}/projects/{project_id}/expenses")
-        if response.status_code == 200:
-            expenses = response.json()
-        else:
-            expenses = []
-    except:
+        expenses = f_expenses.result()
+    except Exception:
         expenses = []
     
     # Calculate budget metrics
@@ -62,65 +116,29 @@ def display_project_detail(project_id):
     
     # Create budget visualization
     if expenses:
-        # Prepare data for pie chart by category
-        expense_by_category = {}
-        for expense in expenses:
-            category = expense.get('category', 'Uncategorized')
-            amount = expense.get('amount', 0)
-            expense_by_category[category] = expense_by_category.get(category, 0) + amount
+        # One frame for both aggregations
+        expense_df = pd.DataFrame(expenses).reindex(columns=['category', 'amount', 'date'])
+        expense_df['category'] = expense_df['category'].fillna('Uncategorized')
+        expense_df['amount'] = expense_df['amount'].fillna(0)
         
-        pie_data = pd.DataFrame({
-            'Category': list(expense_by_category.keys()),
-            'Amount': list(expense_by_category.values())
-        })
+        # Prepare data for pie chart by category
+        pie_data = (
+            expense_df.groupby('category', sort=False)['amount'].sum()
+            .reset_index()
+            .rename(columns={'category': 'Category', 'amount': 'Amount'})
+        )
         
         # Create pie chart
-        fig = px.pie(
-            pie_data, 
-            values='Amount', 
-            names='Category',
-            title='Expenses by Category',
-            color_discrete_sequence=px.colors.sequential.Viridis
-        )
-        st.plotly_chart(fig)
+        st.plotly_chart(build_category_pie(pie_data))
         
         # Expenses over time
-        if any('date' in expense for expense in expenses):
-            expense_by_date = {}
-            for expense in expenses:
-                if 'date' in expense:
-                    date = expense.get('date')
-                    amount = expense.get('amount', 0)
-                    expense_by_date[date] = expense_by_date.get(date, 0) + amount
-            
-            time_data = pd.DataFrame({
-                'Date': list(expense_by_date.keys()),
-                'Amount': list(expense_by_date.values())
-            })
-            time_data['Date'] = pd.to_datetime(time_data['Date'])
-            time_data = time_data.sort_values('Date')
-            
-            # Create cumulative spending line chart
-            time_data['Cumulative'] = time_data['Amount'].cumsum()
-            
-            fig = px.line(
-                time_data, 
-                x='Date', 
-                y='Cumulative',
-                title='Cumulative Spending Over Time',
-                labels={'Cumulative': 'Cumulative Spending ($)', 'Date': ''},
-                color_discrete_sequence=['#19A7CE']
-            )
-            
-            # Add total budget reference line
-            fig.add_hline(
-                y=project.get('total_budget', 0),
-                line_dash="dash",
-                line_color="red",
-                annotation_text="Total Budget"
+        if expense_df['date'].notna().any():
+            time_data = (
+                expense_df.dropna(subset=['date'])
+                .groupby('date', as_index=False)['amount'].sum()
+                .rename(columns={'date': 'Date', 'amount': 'Amount'})
             )
-            
-            st.plotly_chart(fig)
+            st.plotly_chart(build_cumulative_line(time_data, project.get('total_budget', 0)))
     else:
         st.info("No expense data available for this project.")
     
@@ -129,12 +147,8 @@ def display_project_detail(project_id):
     
     # Fetch assets for this project
     try:
-        response = requests.get(f"{API_BASE_URL}/projects/{project_id}/assets")
-        if response.status_code == 200:
-            assets = response.json()
-        else:
-            assets = []
-    except:
+        assets = f_assets.result()
+    except Exception:
         assets = []
     
     if assets:
@@ -2,6 +2,7 @@ import csv
 import sys
 import os
 import datetime
+from functools import lru_cache
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 import pandas as pd
@@ -13,6 +14,20 @@ from models.payment_tracker import Payment
 from database.db_manager import engine, SessionLocal
 from models.base import Base
 
+DEFAULT_CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "payments.csv")
+
+# Columns read by the import and init scripts; notes and usernames are skipped
+PAYMENT_CSV_COLUMNS = ['Date', 'Employee Name', 'Role', 'Game', 'Crypto Amount (SOL)', 'USD Paid', 'Method', 'Status']
+
+@lru_cache(maxsize=1)
+def load_payments_csv(csv_path=DEFAULT_CSV_PATH):
+    """Read and date-parse the payments CSV once per process; callers must not mutate the result"""
+    # Everything is read as text so pandas skips type inference; amounts are
+    # converted where they are used
+    df = pd.read_csv(csv_path, usecols=PAYMENT_CSV_COLUMNS, dtype=str)
+    df['Date'] = pd.to_datetime(df['Date'], format='%m/%d/%Y')
+    return df
+
 def import_payments_from_csv(csv_path):
     """Import payments from CSV file into the database"""
     print(f"Importing payments from {csv_path}...")
@@ -25,47 +40,37 @@ def import_payments_from_csv(csv_path):
     
     try:
         # Read CSV with pandas to handle potential formatting issues
-        df = pd.read_csv(csv_path)
+        df = load_payments_csv(csv_path)
+        
+        # Work out amount, currency and method for all rows at once; SOL takes
+        # precedence over USD, and "-" means no payment in that column
+        crypto = df['Crypto Amount (SOL)'].where(df['Crypto Amount (SOL)'] != '-')
+        usd = df['USD Paid'].where(df['USD Paid'] != '-')
+        is_crypto = crypto.notna()
+        usd_amount = pd.to_numeric(usd.astype(str).str.replace(r'[$,]', '', regex=True), errors='coerce')
+        amount = pd.to_numeric(crypto, errors='coerce').where(is_crypto, usd_amount)
+        
+        valid = amount.notna()
+        for name in df.loc[~valid, 'Employee Name']:
+            print(f"Skipping row for {name} - no valid payment amount")
         
-        # Convert Date column to proper format
-        df['Date'] = pd.to_datetime(df['Date'], format='%m/%d/%Y')
+        rows = df[valid]
+        is_crypto = is_crypto[valid]
+        paid = rows['Status'] == "Paid"
+        records = pd.DataFrame({
+            'employee_id': rows['Employee Name'],
+            'amount': amount[valid],
+            'currency': is_crypto.map({True: "SOL", False: "USD"}),
+            'payment_method': (rows['Method'] == "Bank").map({True: "bank", False: "paypal"}).where(~is_crypto, "crypto_sol"),
+            'status': paid.map({True: "completed", False: "pending"}),
+            'transaction_id': "imported_" + rows['Employee Name'].astype(str) + "_" + rows['Date'].dt.strftime('%Y%m%d'),
+            'created_at': rows['Date'],
+            'completed_at': rows['Date'].astype(object).where(paid, None)
+        }).to_dict(orient='records')
         
-        # Process each row
-        payments_added = 0
-        for _, row in df.iterrows():
-            try:
-                # Determine amount and currency
-                if pd.notna(row['Crypto Amount (SOL)']) and row['Crypto Amount (SOL)'] != '-':
-                    amount = float(row['Crypto Amount (SOL)'])
-                    currency = "SOL"
-                    payment_method = "crypto_sol"
-                elif pd.notna(row['USD Paid']) and row['USD Paid'] != '-':
-                    # Remove $ and convert to float
-                    amount = float(str(row['USD Paid']).replace('$', '').replace(',', ''))
-                    currency = "USD"
-                    payment_method = "bank" if row['Method'] == "Bank" else "paypal"
-                else:
-                    print(f"Skipping row for {row['Employee Name']} - no valid payment amount")
-                    continue  # Skip if no amount info or if it's "-"
-                
-                # Create payment record
-                payment = Payment(
-                    employee_id=row['Employee Name'],
-                    amount=amount,
-                    currency=currency,
-                    payment_method=payment_method,
-                    status="completed" if row['Status'] == "Paid" else "pending",
-                    transaction_id=f"imported_{row['Employee Name']}_{row['Date'].strftime('%Y%m%d')}",
-                    created_at=row['Date'].to_pydatetime(),
-                    completed_at=row['Date'].to_pydatetime() if row['Status'] == "Paid" else None
-                )
-                
-                # Add to database
-                db.add(payment)
-                payments_added += 1
-            except Exception as e:
-                print(f"Error processing row for {row['Employee Name']}: {str(e)}")
-                continue
+        # One executemany instead of a unit-of-work flush per payment
+        db.bulk_insert_mappings(Payment, records)
+        payments_added = len(records)
             
         # Commit changes
         db.commit()
@@ -79,5 +84,4 @@ def import_payments_from_csv(csv_path):
         db.close()
 
 if __name__ == "__main__":
-    csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "payments.csv")
-    import_payments_from_csv(csv_path)
+    import_payments_from_csv(DEFAULT_CSV_PATH)
@@ -3,7 +3,6 @@ import os
 import datetime
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-import pandas as pd
 import random
 
 # Add the parent directory to sys.path to allow importing our models
@@ -13,31 +12,37 @@ from models.asset_tracker import Asset, AssetType, AssetStatus
 from models.budget_tracker import Project
 from database.db_manager import engine, SessionLocal
 from models.base import Base
+from utils.import_payments import DEFAULT_CSV_PATH, load_payments_csv
 
-def initialize_assets():
+def initialize_assets(csv_path=DEFAULT_CSV_PATH):
     """Initialize asset data based on the roles in the payments CSV"""
     print("Initializing asset data...")
     
     # Create tables if they don't exist
     Base.metadata.create_all(engine)
     
+    # create_all skips tables that already exist, and their indexes with them,
+    # so make sure indexes added to the model later exist on older databases
+    for index in Asset.__table__.indexes:
+        index.create(engine, checkfirst=True)
+    
     # Create session
     db = SessionLocal()
     
     try:
-        # Get all projects
-        projects = db.query(Project).all()
-        project_mapping = {project.name: project.id for project in projects}
+        # Get all project names and ids without loading full Project objects
+        project_mapping = dict(db.query(Project.name, Project.id).all())
         
         # Load CSV to get roles
-        csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "payments.csv")
-        payment_df = pd.read_csv(csv_path)
+        payment_df = load_payments_csv(csv_path)
         
         # Extract unique roles and games
         roles = payment_df['Role'].unique()
         
-        # Create asset records for each role and project
-        assets_added = 0
+        # Group roles by game and employees by role once, rather than
+        # filtering the whole CSV for every project and role
+        roles_by_game = payment_df.dropna(subset=['Role']).groupby('Game')['Role'].unique()
+        employees_by_role = payment_df.dropna(subset=['Employee Name']).groupby('Role')['Employee Name'].unique()
         
         # Map roles to asset types (as strings)
         role_to_asset_type = {
@@ -70,10 +75,16 @@ def initialize_assets():
         # Status options as strings
         status_options = ["not_started", "in_progress", "review", "complete"]
         
+        # Load existing asset keys once instead of querying per candidate asset
+        existing_assets = set(db.query(Asset.name, Asset.project_id).all())
+        new_assets = []
+        now = datetime.datetime.now()
+        created_date = now.strftime("%Y-%m-%d")
+        
         # For each project and role, create assets
         for project_name, project_id in project_mapping.items():
             # Filter roles that exist for this project
-            project_roles = payment_df[payment_df['Game'] == project_name]['Role'].dropna().unique()
+            project_roles = roles_by_game.get(project_name, [])
             
             if len(project_roles) == 0:
                 # Use all roles if none specifically match
@@ -87,33 +98,33 @@ def initialize_assets():
                 asset_names = role_to_asset_names.get(role, role_to_asset_names["DEFAULT"])
                 
                 # Get employees with this role
-                employees = payment_df[payment_df['Role'] == role]['Employee Name'].dropna().unique()
+                employees = employees_by_role.get(role, [])
                 if len(employees) == 0:
                     employees = ["Unassigned"]
                 
                 # Create 1-3 assets for this role and project
                 for asset_name in random.sample(asset_names, min(3, len(asset_names))):
-                    # Check if asset already exists
-                    existing_asset = db.query(Asset).filter(
-                        Asset.name == f"{project_name} - {asset_name}",
-                        Asset.project_id == project_id
-                    ).first()
+                    full_name = f"{project_name} - {asset_name}"
                     
-                    if not existing_asset:
+                    # Check if asset already exists
+                    if (full_name, project_id) not in existing_assets:
                         # Create new asset with random progress
                         new_asset = Asset(
-                            name=f"{project_name} - {asset_name}",
+                            name=full_name,
                             description=f"{asset_name} for {project_name}",
                             asset_type=asset_type,  # Store as string, not enum
                             status=random.choice(status_options),  # Store as string, not enum
                             progress=random.randint(0, 100),
                             assigned_to=random.choice(employees),
                             project_id=project_id,
-                            created_date=datetime.datetime.now().strftime("%Y-%m-%d"),
-                            due_date=(datetime.datetime.now() + datetime.timedelta(days=random.randint(7, 60))).strftime("%Y-%m-%d")
+                            created_date=created_date,
+                            due_date=(now + datetime.timedelta(days=random.randint(7, 60))).strftime("%Y-%m-%d")
                         )
-                        db.add(new_asset)
-                        assets_added += 1
+                        new_assets.append(new_asset)
+                        existing_assets.add((full_name, project_id))
+        
+        db.bulk_save_objects(new_assets)
+        assets_added = len(new_assets)
         
         # Commit to save assets
         db.commit()
@@ -3,7 +3,6 @@ import os
 import datetime
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-import pandas as pd
 
 # Add the parent directory to sys.path to allow importing our models
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,8 +10,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.payment_tracker import Payment
 from models.budget_tracker import Project, Expense
 from database.db_manager import engine, SessionLocal
+from utils.import_payments import DEFAULT_CSV_PATH, load_payments_csv
 
-def initialize_projects():
+def initialize_projects(csv_path=DEFAULT_CSV_PATH):
     """Initialize project data and associate payments with projects"""
     print("Initializing project data...")
     
@@ -20,6 +20,11 @@ def initialize_projects():
     from models.budget_tracker import Base
     Base.metadata.create_all(engine)
     
+    # create_all skips tables that already exist, and their indexes with them,
+    # so make sure indexes added to the model later exist on older databases
+    for index in Expense.__table__.indexes:
+        index.create(engine, checkfirst=True)
+    
     # Create session
     db = SessionLocal()
     
@@ -79,8 +84,8 @@ def initialize_projects():
                 project_mapping[project_data["name"]] = existing_project
                 print(f"Project already exists: {project_data['name']}")
         
-        # Commit to save projects
-        db.commit()
+        # Projects are flushed, not committed: they are saved together with the
+        # expenses below in a single transaction
         
         # Now associate payments with projects and create expense records
         print("Associating payments with projects and creating expense records...")
@@ -101,18 +106,18 @@ def initialize_projects():
         }
         
         # Load CSV to get game information for each payment
-        csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "payments.csv")
-        payment_df = pd.read_csv(csv_path)
+        payment_df = load_payments_csv(csv_path)
         
         # Create a mapping of employee+date to game
-        emp_date_to_game = {}
-        for _, row in payment_df.iterrows():
-            date_str = pd.to_datetime(row['Date'], format='%m/%d/%Y').strftime('%Y%m%d')
-            key = f"{row['Employee Name']}_{date_str}"
-            emp_date_to_game[key] = row['Game']
+        dates = payment_df['Date'].dt.strftime('%Y%m%d')
+        keys = payment_df['Employee Name'].astype(str) + "_" + dates
+        emp_date_to_game = dict(zip(keys, payment_df['Game']))
+        
+        # Load existing expense keys once instead of querying per payment
+        existing = set(db.query(Expense.project_id, Expense.description, Expense.date).all())
         
         # Process payments and create expenses
-        expenses_added = 0
+        new_expenses = []
         for payment in payments:
             # Extract date in format YYYYMMDD
             if payment.created_at:
@@ -124,27 +129,25 @@ def initialize_projects():
                 
                 if game and game in game_to_project and game_to_project[game]:
                     project_id = game_to_project[game]
+                    description = f"Payment to {payment.employee_id}"
+                    expense_date = payment.created_at.strftime('%Y-%m-%d')
                     
                     # Check if expense already exists
-                    existing_expense = db.query(Expense).filter(
-                        Expense.project_id == project_id,
-                        Expense.description == f"Payment to {payment.employee_id}",
-                        Expense.date == payment.created_at.strftime('%Y-%m-%d')
-                    ).first()
-                    
-                    if not existing_expense:
+                    if (project_id, description, expense_date) not in existing:
                         # Create expense record
-                        expense = Expense(
+                        new_expenses.append(Expense(
                             project_id=project_id,
                             category="Development",  # Default category
                             amount=payment.amount * 150 if payment.currency == "SOL" else payment.amount,  # Convert SOL to USD at $150/SOL
-                            date=payment.created_at.strftime('%Y-%m-%d'),
-                            description=f"Payment to {payment.employee_id}"
-                        )
-                        db.add(expense)
-                        expenses_added += 1
+                            date=expense_date,
+                            description=description
+                        ))
+                        existing.add((project_id, description, expense_date))
+        
+        db.bulk_save_objects(new_expenses)
+        expenses_added = len(new_expenses)
         
-        # Commit to save expenses
+        # Commit projects and expenses together
         db.commit()
         print(f"Added {expenses_added} expense records based on payments.")
         
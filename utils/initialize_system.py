@@ -1,6 +1,5 @@
 import os
 import sys
-import time
 
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -14,17 +13,17 @@ def initialize_system():
     """Initialize the entire Thomas AI system database"""
     print("Starting Thomas AI system initialization...")
     
-    # Step 1: Import payments from CSV
+    # Step 1: Import payments from CSV (parsed once and shared by every step)
     csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "payments.csv")
     import_payments_from_csv(csv_path)
-    time.sleep(1)  # Short pause for better console output readability
+    sys.stdout.flush()
     
     # Step 2: Initialize projects and associate payments
-    initialize_projects()
-    time.sleep(1)
+    initialize_projects(csv_path)
+    sys.stdout.flush()
     
     # Step 3: Initialize assets based on roles
-    initialize_assets()
+    initialize_assets(csv_path)
     
     print("\nThomas AI system initialization complete!")
     print("\nNext steps:")